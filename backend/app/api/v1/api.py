@@ -3,7 +3,7 @@ Main API router for MVP
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import users, workouts, ai, auth, progress
+from app.api.v1.endpoints import users, workouts, ai, auth, progress, admin
 
 api_router = APIRouter()
 
@@ -12,4 +12,5 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(workouts.router, prefix="/workouts", tags=["workouts"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
-api_router.include_router(progress.router, prefix="/progress", tags=["progress"]) 
\ No newline at end of file
+api_router.include_router(progress.router, prefix="/progress", tags=["progress"]) 
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"], include_in_schema=False)
@@ -0,0 +1,54 @@
+"""
+Служебные эндпоинты для диагностики работающего воркера
+"""
+
+import asyncio
+import hmac
+import threading
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import structlog
+
+from app.core.config import settings
+from app.core.profiler import SamplingProfiler
+
+router = APIRouter()
+logger = structlog.get_logger()
+
+# Один профилировщик на воркер: параллельные сессии только искажают картину
+_profile_lock = threading.Lock()
+
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Проверка служебного токена; без ADMIN_API_TOKEN эндпоинты выключены"""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=100)
+):
+    """
+    Семплирующий профилировщик текущего воркера на `seconds` секунд.
+
+    Возвращает стеки в collapsed-формате (flamegraph.pl, speedscope).
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Profiling already in progress")
+
+    try:
+        logger.info("Profiling started", seconds=seconds, interval_ms=interval_ms)
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = profiler.stop()
+        return stacks
+    finally:
+        _profile_lock.release()
@@ -2,12 +2,15 @@
 AI Endpoints для генерации тренировок и планов питания
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.core.database import get_db
+from app.core.http_cache import STATIC_CACHE_CONTROL, cache_headers, etag_matches, not_modified
 from app.services.ai_service import ai_service, UserProfile, Workout
+from app.services.workout_templates import workout_templates
 from app.models.user import User
 import structlog
 
@@ -122,69 +125,31 @@ async def analyze_exercise_form(
 @router.get("/workout-templates/{level}")
 async def get_workout_templates(
     level: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    equipment: Optional[str] = None,
+    max_duration: Optional[int] = Query(None, ge=1, description="Максимальная длительность в минутах")
 ):
     """
     Получение готовых шаблонов тренировок по уровню подготовки
-    """
-    templates = {
-        "beginner": [
-            {
-                "id": 1,
-                "name": "Полное тело для начинающих",
-                "duration": 30,
-                "exercises_count": 5,
-                "equipment": "без оборудования"
-            },
-            {
-                "id": 2,
-                "name": "Кардио старт",
-                "duration": 20,
-                "exercises_count": 4,
-                "equipment": "без оборудования"
-            }
-        ],
-        "intermediate": [
-            {
-                "id": 3,
-                "name": "Верх тела",
-                "duration": 45,
-                "exercises_count": 8,
-                "equipment": "гантели"
-            },
-            {
-                "id": 4,
-                "name": "HIIT тренировка",
-                "duration": 30,
-                "exercises_count": 6,
-                "equipment": "без оборудования"
-            }
-        ],
-        "advanced": [
-            {
-                "id": 5,
-                "name": "Силовая программа",
-                "duration": 60,
-                "exercises_count": 10,
-                "equipment": "полный набор"
-            },
-            {
-                "id": 6,
-                "name": "Экстремальное кардио",
-                "duration": 45,
-                "exercises_count": 8,
-                "equipment": "минимальное"
-            }
-        ]
-    }
     
-    if level not in templates:
+    Шаблоны берутся из app/data/workout_templates.json в порядке файла;
+    каждый шаблон сериализуется один раз, ответ на фильтр собирается при
+    первом запросе и дальше берется из памяти.
+    """
+    prepared = workout_templates.lookup(level, equipment, max_duration)
+    if prepared is None:
         raise HTTPException(
             status_code=400,
-            detail="Invalid fitness level. Choose from: beginner, intermediate, advanced"
+            detail=f"Invalid fitness level. Choose from: {', '.join(workout_templates.levels)}"
         )
     
-    return templates[level]
+    if etag_matches(request, prepared.etag):
+        return not_modified(prepared.etag, STATIC_CACHE_CONTROL)
+    return Response(
+        prepared.body,
+        media_type="application/json",
+        headers=cache_headers(prepared.etag, STATIC_CACHE_CONTROL)
+    )
 
 
 @router.post("/save-workout")
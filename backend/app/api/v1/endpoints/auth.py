@@ -2,17 +2,22 @@
 Авторизация через Telegram
 """
 
+import hashlib
+import time
 from fastapi import APIRouter, HTTPException, Depends, Header
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from pydantic import BaseModel
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_read_session
 from app.models.user import User
 from app.services.telegram_auth_service import get_telegram_auth_service
+from app.services.user_service import cache_user, get_cached_user
 import structlog
 
 router = APIRouter()
@@ -21,6 +26,27 @@ logger = structlog.get_logger()
 # Настройка JWT
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# sha256(token) -> проверенные claims, хранятся до истечения токена
+_verified_tokens = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+
+
+class TokenClaims(BaseModel):
+    """Claims из access токена, которых хватает большинству endpoints без загрузки User"""
+    user_id: int  # внутренний id пользователя
+    telegram_id: int
+    level: int = 1
+    is_premium: bool = False
+
+
+def build_token_claims(user: User) -> Dict[str, Any]:
+    """Данные для access токена"""
+    return {
+        "sub": str(user.telegram_id),
+        "uid": user.id,
+        "lvl": user.level or 1,
+        "prem": bool(user.is_premium)
+    }
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Создание JWT токена"""
@@ -35,40 +61,129 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[int]:
-    """Проверка JWT токена"""
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Проверка подписи JWT с кэшем уже проверенных токенов"""
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-        return user_id
     except JWTError:
         return None
 
+    # Кэшируем не дольше срока жизни самого токена
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp else settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    _verified_tokens.set(cache_key, payload, ttl=ttl)
+    return payload
+
+
+def verify_token(token: str) -> Optional[int]:
+    """Проверка JWT токена"""
+    payload = decode_token(token)
+    if not payload or payload.get("sub") is None:
+        return None
+    try:
+        return int(payload["sub"])
+    except (TypeError, ValueError):
+        return None
+
+
+def _extract_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    try:
+        scheme, token = authorization.split()
+    except ValueError:
+        return None
+    return token if scheme.lower() == 'bearer' else None
+
 
 async def get_current_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     """Получение текущего пользователя по токену"""
-    if not authorization:
-        return None
-    
     # Извлекаем токен из заголовка
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != 'bearer':
-            return None
-    except ValueError:
+    token = _extract_bearer_token(authorization)
+    if not token:
         return None
     
     user_id = verify_token(token)
     if not user_id:
         return None
     
-    user = db.query(User).filter(User.telegram_id == user_id).first()
-    return user
+    return get_cached_user(db, user_id)
+
+
+async def get_current_user_for_update(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """
+    Текущий пользователь для изменения счетчиков и профиля.
+    
+    Строка читается из БД с блокировкой (SELECT ... FOR UPDATE), а не из кэша:
+    кэш другого процесса может отставать, и запись перетерла бы чужие изменения.
+    """
+    token = _extract_bearer_token(authorization)
+    if not token:
+        return None
+    
+    telegram_id = verify_token(token)
+    if not telegram_id:
+        return None
+    
+    return db.query(User).filter(User.telegram_id == telegram_id).with_for_update().first()
+
+
+async def get_current_claims(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """
+    Claims текущего пользователя без обращения к БД.
+    
+    Токены, выпущенные до добавления claims (без uid), разрешаются через кэш пользователей.
+    """
+    token = _extract_bearer_token(authorization)
+    payload = decode_token(token) if token else None
+    if not payload or payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        telegram_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    if payload.get("uid") is not None:
+        return TokenClaims(
+            user_id=payload["uid"],
+            telegram_id=telegram_id,
+            level=payload.get("lvl", 1),
+            is_premium=payload.get("prem", False)
+        )
+    
+    user = get_cached_user(db, telegram_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return TokenClaims(
+        user_id=user.id,
+        telegram_id=user.telegram_id,
+        level=user.level or 1,
+        is_premium=bool(user.is_premium)
+    )
+
+
+def get_user_read_db(claims: TokenClaims = Depends(get_current_claims)):
+    """Read-only сессия для текущего пользователя (реплика, если она актуальна)"""
+    db = get_read_session(claims.user_id)
+    try:
+        yield db
+    finally:
+        db.close()
 
 
 @router.post("/telegram/auth", response_model=Dict[str, Any])
@@ -84,7 +199,10 @@ async def telegram_auth(
     """
     try:
         # Инициализируем сервис авторизации
-        auth_service = get_telegram_auth_service(settings.TELEGRAM_BOT_TOKEN or "")
+        auth_service = get_telegram_auth_service(
+            settings.TELEGRAM_BOT_TOKEN or "",
+            settings.TELEGRAM_EXTRA_BOT_TOKENS
+        )
         
         # Валидируем данные от Telegram
         validated_data = auth_service.validate_init_data(init_data)
@@ -131,11 +249,10 @@ async def telegram_auth(
         
         db.commit()
         db.refresh(user)
+        cache_user(user)
         
         # Создаем JWT токен
-        access_token = create_access_token(
-            data={"sub": str(user.telegram_id)}
-        )
+        access_token = create_access_token(data=build_token_claims(user))
         
         logger.info(f"User authenticated: {user.telegram_id}")
         
@@ -215,9 +332,7 @@ async def refresh_token(
         )
     
     # Создаем новый токен
-    access_token = create_access_token(
-        data={"sub": str(current_user.telegram_id)}
-    )
+    access_token = create_access_token(data=build_token_claims(current_user))
     
     return {
         "access_token": access_token,
@@ -2,16 +2,23 @@
 API для отслеживания прогресса тренировок
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, record_write
+from app.core.http_cache import PRIVATE_CACHE_CONTROL, cache_headers, etag_matches, make_etag, not_modified
+from app.core.responses import FastJSONResponse
 from app.models.user import User
 from app.models.workout_history import WorkoutHistory, ExerciseHistory, ProgressMilestone, BodyMetrics
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import (
+    TokenClaims, build_token_claims, create_access_token,
+    get_current_claims, get_current_user, get_current_user_for_update, get_user_read_db
+)
+from app.services.telegram_bot_service import invalidate_stat_card
+from app.services.user_service import invalidate_user
 import structlog
 
 router = APIRouter()
@@ -21,13 +28,13 @@ logger = structlog.get_logger()
 @router.post("/workout/start", response_model=Dict[str, Any])
 async def start_workout(
     workout_data: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Начать новую тренировку"""
     try:
         workout = WorkoutHistory(
-            user_id=current_user.id,
+            user_id=claims.user_id,
             workout_type=workout_data.get("type", "general"),
             workout_name=workout_data.get("name", "Тренировка"),
             exercises=workout_data.get("exercises", []),
@@ -38,6 +45,7 @@ async def start_workout(
         
         db.add(workout)
         db.commit()
+        await record_write(claims.user_id)
         db.refresh(workout)
         
         return {
@@ -55,10 +63,13 @@ async def start_workout(
 async def complete_workout(
     workout_id: int,
     completion_data: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     """Завершить тренировку"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
     try:
         workout = db.query(WorkoutHistory).filter(
             WorkoutHistory.id == workout_id,
@@ -116,13 +127,18 @@ async def complete_workout(
             db.add(milestone)
         
         db.commit()
+        await record_write(current_user.id)
+        invalidate_user(current_user.telegram_id)
+        invalidate_stat_card(current_user.telegram_id)
         
         return {
             "success": True,
             "exp_gained": exp_gained,
             "new_level": current_user.level,
             "new_streak": current_user.streak_days,
-            "total_workouts": current_user.total_workouts
+            "total_workouts": current_user.total_workouts,
+            # Новый токен, чтобы claims (уровень) не отставали от профиля
+            "access_token": create_access_token(data=build_token_claims(current_user))
         }
         
     except HTTPException:
@@ -135,13 +151,13 @@ async def complete_workout(
 @router.post("/exercise/log", response_model=Dict[str, Any])
 async def log_exercise(
     exercise_data: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Записать выполнение упражнения"""
     try:
         exercise = ExerciseHistory(
-            user_id=current_user.id,
+            user_id=claims.user_id,
             workout_history_id=exercise_data.get("workout_id"),
             exercise_name=exercise_data.get("name"),
             muscle_groups=exercise_data.get("muscle_groups", []),
@@ -164,6 +180,7 @@ async def log_exercise(
         
         db.add(exercise)
         db.commit()
+        await record_write(claims.user_id)
         
         return {"success": True, "exercise_id": exercise.id}
         
@@ -175,7 +192,7 @@ async def log_exercise(
 @router.get("/stats/overview", response_model=Dict[str, Any])
 async def get_stats_overview(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_read_db)
 ):
     """Получить общую статистику пользователя"""
     try:
@@ -211,7 +228,7 @@ async def get_stats_overview(
             desc(WorkoutHistory.completed_at)
         ).limit(5).all()
         
-        return {
+        return FastJSONResponse({
             "total_workouts": current_user.total_workouts,
             "total_minutes": current_user.total_minutes,
             "total_calories": current_user.calories_burned,
@@ -236,7 +253,7 @@ async def get_stats_overview(
                     "calories": w.calories_burned
                 } for w in recent
             ]
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
@@ -246,8 +263,8 @@ async def get_stats_overview(
 @router.get("/stats/chart/{period}", response_model=Dict[str, Any])
 async def get_chart_data(
     period: str,  # week, month, year
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_user_read_db)
 ):
     """Получить данные для графиков"""
     try:
@@ -263,7 +280,7 @@ async def get_chart_data(
         
         # Получаем тренировки за период
         workouts = db.query(WorkoutHistory).filter(
-            WorkoutHistory.user_id == current_user.id,
+            WorkoutHistory.user_id == claims.user_id,
             WorkoutHistory.completed_at >= start_date,
             WorkoutHistory.completed_at.isnot(None)
         ).order_by(WorkoutHistory.completed_at).all()
@@ -288,7 +305,7 @@ async def get_chart_data(
         minutes = [data_by_day[day]["minutes"] for day in labels]
         calories = [data_by_day[day]["calories"] for day in labels]
         
-        return {
+        return FastJSONResponse({
             "labels": labels,
             "datasets": {
                 "workouts": workout_counts,
@@ -300,7 +317,7 @@ async def get_chart_data(
                 "minutes": sum(minutes),
                 "calories": sum(calories)
             }
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting chart data: {e}")
@@ -309,16 +326,25 @@ async def get_chart_data(
 
 @router.get("/milestones", response_model=List[Dict[str, Any]])
 async def get_milestones(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_user_read_db)
 ):
     """Получить достижения пользователя"""
     try:
+        # Достижения только добавляются, поэтому (count, max id) - версия списка
+        stamp = db.query(func.count(ProgressMilestone.id), func.max(ProgressMilestone.id)).filter(
+            ProgressMilestone.user_id == claims.user_id
+        ).one()
+        etag = make_etag("milestones", claims.user_id, *stamp)
+        if etag_matches(request, etag):
+            return not_modified(etag, PRIVATE_CACHE_CONTROL)
+        
         milestones = db.query(ProgressMilestone).filter(
-            ProgressMilestone.user_id == current_user.id
+            ProgressMilestone.user_id == claims.user_id
         ).order_by(desc(ProgressMilestone.achieved_at)).limit(20).all()
         
-        return [
+        return FastJSONResponse([
             {
                 "id": m.id,
                 "type": m.milestone_type,
@@ -327,7 +353,7 @@ async def get_milestones(
                 "previous_value": m.previous_value,
                 "achieved_at": m.achieved_at.isoformat()
             } for m in milestones
-        ]
+        ], headers=cache_headers(etag, PRIVATE_CACHE_CONTROL))
         
     except Exception as e:
         logger.error(f"Error getting milestones: {e}")
@@ -337,13 +363,13 @@ async def get_milestones(
 @router.post("/body-metrics", response_model=Dict[str, Any])
 async def add_body_metrics(
     metrics: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Добавить замеры тела"""
     try:
         body_metrics = BodyMetrics(
-            user_id=current_user.id,
+            user_id=claims.user_id,
             weight=metrics.get("weight"),
             body_fat_percentage=metrics.get("body_fat"),
             muscle_mass=metrics.get("muscle_mass"),
@@ -361,14 +387,14 @@ async def add_body_metrics(
         
         # Проверяем прогресс в весе
         previous_weight = db.query(BodyMetrics).filter(
-            BodyMetrics.user_id == current_user.id,
+            BodyMetrics.user_id == claims.user_id,
             BodyMetrics.id != body_metrics.id
         ).order_by(desc(BodyMetrics.measured_at)).first()
         
         if previous_weight and abs(previous_weight.weight - body_metrics.weight) >= 1:
             # Создаем milestone для изменения веса
             milestone = ProgressMilestone(
-                user_id=current_user.id,
+                user_id=claims.user_id,
                 milestone_type="weight_change",
                 milestone_name=f"Изменение веса: {'−' if body_metrics.weight < previous_weight.weight else '+'}{abs(body_metrics.weight - previous_weight.weight):.1f} кг",
                 milestone_value=body_metrics.weight,
@@ -377,6 +403,7 @@ async def add_body_metrics(
             db.add(milestone)
         
         db.commit()
+        await record_write(claims.user_id)
         
         return {"success": True, "message": "Замеры сохранены"}
         
@@ -387,16 +414,25 @@ async def add_body_metrics(
 
 @router.get("/body-metrics/history", response_model=List[Dict[str, Any]])
 async def get_body_metrics_history(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_user_read_db)
 ):
     """Получить историю замеров тела"""
     try:
+        # Замеры только добавляются, поэтому (count, max id) - версия истории
+        stamp = db.query(func.count(BodyMetrics.id), func.max(BodyMetrics.id)).filter(
+            BodyMetrics.user_id == claims.user_id
+        ).one()
+        etag = make_etag("body-metrics", claims.user_id, *stamp)
+        if etag_matches(request, etag):
+            return not_modified(etag, PRIVATE_CACHE_CONTROL)
+        
         metrics = db.query(BodyMetrics).filter(
-            BodyMetrics.user_id == current_user.id
+            BodyMetrics.user_id == claims.user_id
         ).order_by(desc(BodyMetrics.measured_at)).limit(12).all()
         
-        return [
+        return FastJSONResponse([
             {
                 "id": m.id,
                 "weight": m.weight,
@@ -414,7 +450,7 @@ async def get_body_metrics_history(
                 },
                 "date": m.measured_at.isoformat()
             } for m in metrics
-        ]
+        ], headers=cache_headers(etag, PRIVATE_CACHE_CONTROL))
         
     except Exception as e:
         logger.error(f"Error getting body metrics history: {e}")
@@ -2,20 +2,28 @@
 Workout API endpoints for MVP
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.core.http_cache import CATALOG_CACHE_CONTROL, cache_headers, etag_matches, make_etag, not_modified
+from app.core.responses import model_response
 from app.models.workout import (
     WorkoutCreate, WorkoutUpdate, WorkoutResponse,
     ExerciseResponse, WorkoutExerciseCreate
 )
 from app.services.workout_service import WorkoutService
 from app.services.exercise_service import ExerciseService
+from app.services.exercise_catalog import exercise_catalog
 
 router = APIRouter()
 
+# List endpoints serialize straight to JSON bytes (see model_response)
+workout_list_adapter = TypeAdapter(List[WorkoutResponse])
+exercise_list_adapter = TypeAdapter(List[ExerciseResponse])
+
 
 @router.post("/", response_model=WorkoutResponse, status_code=status.HTTP_201_CREATED)
 def create_workout(
@@ -37,7 +45,7 @@ def get_user_workouts(
 ):
     """Get user workouts"""
     workout_service = WorkoutService(db)
-    return workout_service.get_user_workouts(telegram_id, limit, offset)
+    return model_response(workout_list_adapter, workout_service.get_user_workouts(telegram_id, limit, offset))
 
 
 @router.get("/{workout_id}", response_model=WorkoutResponse)
@@ -85,6 +93,7 @@ def complete_workout(workout_id: int, db: Session = Depends(get_db)):
 
 @router.get("/exercises/", response_model=List[ExerciseResponse])
 def get_exercises(
+    request: Request,
     muscle_group: str = Query(None, description="Filter by muscle group"),
     equipment: str = Query(None, description="Filter by equipment"),
     difficulty: str = Query(None, description="Filter by difficulty"),
@@ -93,8 +102,30 @@ def get_exercises(
     db: Session = Depends(get_db)
 ):
     """Get available exercises"""
+    # The catalog version covers every filter combination; the URL carries the filters
+    snapshot = exercise_catalog.ensure_fresh(db)
+    etag = make_etag("exercises", snapshot.version, snapshot.content_hash)
+    if etag_matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+    exercise_service = ExerciseService(db)
+    response = model_response(
+        exercise_list_adapter,
+        exercise_service.get_exercises(muscle_group, equipment, difficulty, limit, offset)
+    )
+    response.headers.update(cache_headers(etag, CATALOG_CACHE_CONTROL))
+    return response
+
+
+@router.get("/exercises/search", response_model=List[ExerciseResponse])
+def search_exercises(
+    q: str = Query(..., min_length=1, max_length=100, description="Search query"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Search exercises by name and description"""
     exercise_service = ExerciseService(db)
-    return exercise_service.get_exercises(muscle_group, equipment, difficulty, limit, offset)
+    return model_response(exercise_list_adapter, exercise_service.search_exercises(q, limit))
 
 
 @router.post("/generate/", response_model=WorkoutResponse)
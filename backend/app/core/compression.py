@@ -0,0 +1,182 @@
+"""
+Response compression (gzip, brotli when installed)
+"""
+
+import gzip
+import hashlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import create_counter
+from app.core.rate_limit import TokenBucket
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, see requirements-prod.txt
+    brotli = None
+
+COMPRESSION_RESPONSES = create_counter(
+    'http_response_compression_total',
+    'Compressible responses by encoding and outcome',
+    ['encoding', 'result']
+)
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml", "image/svg+xml", "text/"
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding from Accept-Encoding; brotli is preferred, q=0 excludes"""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(status: int, headers: Headers) -> bool:
+    """Response whose representation depends on Accept-Encoding"""
+    return (
+        status not in (204, 304)
+        and "content-encoding" not in headers
+        and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+def with_vary(start: Message) -> Message:
+    """Add Vary: Accept-Encoding to a compressible response start message"""
+    headers = MutableHeaders(raw=list(start["headers"]))
+    if not is_compressible(start["status"], headers):
+        return start
+    headers.add_vary_header("Accept-Encoding")
+    return {**start, "headers": headers.raw}
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing single-message responses
+
+    Bodies below minimum_size are sent as is. Compression draws uncompressed
+    bytes from a per-process token bucket; when it is empty, responses go out
+    uncompressed instead of queueing CPU work on the event loop. Compressed
+    variants are cached by body digest, so static payloads (templates,
+    catalog pages, fallback workouts) are compressed once. Every compressible
+    response carries Vary: Accept-Encoding, whether or not it was compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        bytes_per_second: int = settings.COMPRESSION_BYTES_PER_SECOND,
+        cache_size: int = settings.COMPRESSION_CACHE_SIZE,
+        max_cached_size: int = settings.COMPRESSION_MAX_CACHED_SIZE
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.budget = TokenBucket(bytes_per_second, bytes_per_second)
+        self.max_cached_size = max_cached_size
+        self._variants = TTLCache(maxsize=cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            # Nothing to negotiate, but caches must still key on Accept-Encoding
+            async def send_vary(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message = with_vary(message)
+                await send(message)
+
+            await self.app(scope, receive, send_vary)
+            return
+
+        start: List[Message] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start.append(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if message.get("more_body", False):
+                # Streaming response: leave it alone
+                passthrough = True
+                await send(with_vary(start[0]))
+                await send(message)
+                return
+
+            start_message, body = self._encode(start[0], message.get("body", b""), encoding)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _encode(self, start: Message, body: bytes, encoding: str) -> Tuple[Message, bytes]:
+        headers = MutableHeaders(raw=list(start["headers"]))
+        if not is_compressible(start["status"], headers):
+            return start, body
+
+        # The representation depends on Accept-Encoding from here on
+        headers.add_vary_header("Accept-Encoding")
+        if len(body) < self.minimum_size:
+            return {**start, "headers": headers.raw}, body
+
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        compressed = self._variants.get(key)
+        if compressed is not None:
+            COMPRESSION_RESPONSES.labels(encoding=encoding, result="cached").inc()
+        elif self.budget.take(min(len(body), self.budget.capacity)) > 0:
+            COMPRESSION_RESPONSES.labels(encoding=encoding, result="over_budget").inc()
+            return {**start, "headers": headers.raw}, body
+        else:
+            compressed = compress(body, encoding)
+            if len(body) <= self.max_cached_size:
+                self._variants.set(key, compressed)
+            COMPRESSION_RESPONSES.labels(encoding=encoding, result="compressed").inc()
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # Byte-level validator no longer matches the identity body
+            headers["ETag"] = f"W/{etag}"
+        return {**start, "headers": headers.raw}, compressed
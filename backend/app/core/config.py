@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     # Database - using SQLite for local development to avoid PostgreSQL dependency
     DATABASE_URL: str = "sqlite:///./aigym_coach.db"
     DATABASE_TEST_URL: str = "sqlite:///./aigym_coach_test.db"
+    DATABASE_REPLICA_URL: Optional[str] = None  # read-only replica for analytics/history reads
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL: float = 2.0
+    READ_YOUR_WRITES_SECONDS: float = 30.0  # keep a user on the primary after their writes
+    READ_YOUR_WRITES_BACKEND: str = "redis"  # 'redis' (REDIS_URL, seen by all workers) or 'memory' (single process)
+    DB_SLOW_QUERY_MS: float = 200.0  # statements slower than this go to the slow-query log
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -34,6 +40,7 @@ class Settings(BaseSettings):
     
     # Telegram
     TELEGRAM_BOT_TOKEN: Optional[str] = None
+    TELEGRAM_EXTRA_BOT_TOKENS: List[str] = []  # e.g. staging bot accepted alongside prod
     TELEGRAM_WEBHOOK_URL: Optional[str] = None
     TELEGRAM_MINIAPP_URL: Optional[str] = None
     
@@ -78,10 +85,18 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    ADMIN_API_TOKEN: Optional[str] = None  # X-Admin-Token for /api/v1/admin; admin routes are off when unset
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # 'memory' (per process) or 'redis' (shared by workers)
+    TRUSTED_PROXY_COUNT: int = 0  # proxies in front of the app that append to X-Forwarded-For (0 - ignore the header)
+    RATE_LIMIT_AI_PER_MINUTE: int = 10  # per user, each AI generation route
+    RATE_LIMIT_AI_GLOBAL_PER_MINUTE: int = 120  # all users, each AI generation route
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 30
+    RATE_LIMIT_AUTH_GLOBAL_PER_MINUTE: int = 600
     
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/3"
@@ -115,6 +130,24 @@ class Settings(BaseSettings):
     CACHE_TTL: int = 3600
     SESSION_TIMEOUT: int = 86400
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # verified JWT claims kept until token expiry
+    USER_CACHE_TTL_SECONDS: int = 30  # identity-map cache of User rows
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_ID_CACHE_MAX_SIZE: int = 100000  # telegram_id -> users.id, never expires
+    EXERCISE_CATALOG_REFRESH_SECONDS: int = 60  # how often the in-memory catalog checks its version stamp
+    WORKOUT_TEMPLATES_PATH: Optional[str] = None  # JSON template catalog; defaults to app/data/workout_templates.json
+    BOT_STATS_CACHE_TTL_SECONDS: int = 3600  # rendered bot stat cards; rebuilt earlier when the user row changes
+    BOT_STATS_CACHE_MAX_SIZE: int = 10000
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # smaller bodies are not worth a gzip/brotli frame
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5  # used when the optional brotli package is installed
+    COMPRESSION_BYTES_PER_SECOND: int = 20971520  # 20MB/s of input per process; beyond that send uncompressed
+    COMPRESSION_CACHE_SIZE: int = 512  # compressed variants kept by body digest
+    COMPRESSION_MAX_CACHED_SIZE: int = 262144  # 256KB, larger bodies are compressed but not cached
+    
+    # Profiling
+    REQUEST_PROFILING_ENABLED: bool = False  # honour the X-Profile header (never in production)
     
     # External Services
     HEALTH_CHECK_URL: str = "https://your-domain.com/health"
@@ -136,6 +169,14 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
     
+    @validator("TELEGRAM_EXTRA_BOT_TOKENS", pre=True)
+    def assemble_extra_bot_tokens(cls, v):
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, (list, str)):
+            return v
+        raise ValueError(v)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,32 +2,78 @@
 Database configuration for MVP
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import structlog
+
 from app.core.config import settings
+from app.core.db_metrics import instrument_engine
 
-# Create database engine with SQLite-specific settings
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        echo=settings.DEBUG,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        settings.DATABASE_URL,
+logger = structlog.get_logger()
+
+
+def _create_engine(url: str) -> Engine:
+    """Create database engine with SQLite-specific settings"""
+    if url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_pre_ping=True,
+            echo=settings.DEBUG,
+            connect_args={"check_same_thread": False}
+        )
+    return create_engine(
+        url,
         pool_pre_ping=True,
         echo=settings.DEBUG
     )
 
-# Create session factory
+
+# Primary (read-write) engine
+engine = _create_engine(settings.DATABASE_URL)
+
+# Optional read replica for read-heavy endpoints that tolerate slight staleness
+replica_engine: Optional[Engine] = (
+    _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+)
+
+instrument_engine(engine, "primary")
+if replica_engine is not None:
+    instrument_engine(replica_engine, "replica")
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
 
 # Create base class for models
 Base = declarative_base()
 
+# user_id -> monotonic time of the user's last write (read-your-writes window);
+# local fast path, shared across workers through Redis (see _writers_store)
+_recent_writers: Dict[int, float] = {}
+# retry_at: Redis is not contacted before this time after a failure;
+# primary_until: reads stay on the primary, since marks may have been lost
+_writers_redis = {
+    "client": None,
+    "disabled": settings.READ_YOUR_WRITES_BACKEND != "redis",
+    "retry_at": 0.0,
+    "primary_until": 0.0,
+}
+
+# Seconds to leave the read-your-writes store alone after a failure
+WRITERS_STORE_RETRY_SECONDS = 5.0
+
+# Cached replica health: (checked_at, is_fresh)
+_replica_state = {"checked_at": 0.0, "fresh": False}
+
 
 def get_db():
     """Dependency to get database session"""
@@ -38,10 +84,129 @@ def get_db():
         db.close()
 
 
+def _writers_store():
+    """Redis client for the read-your-writes marks, or None when running per process"""
+    if _writers_redis["disabled"]:
+        return None
+    if _writers_redis["client"] is None:
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed, read-your-writes works per process only")
+            _writers_redis["disabled"] = True
+            return None
+        _writers_redis["client"] = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _writers_redis["client"]
+
+
+def _writers_store_failed(error: Exception) -> None:
+    """Back off from the store; until marks written meanwhile expire, read from the primary"""
+    now = time.monotonic()
+    if now >= _writers_redis["retry_at"]:
+        logger.warning(f"Read-your-writes store unavailable: {error}")
+    _writers_redis["retry_at"] = now + WRITERS_STORE_RETRY_SECONDS
+    _writers_redis["primary_until"] = now + max(WRITERS_STORE_RETRY_SECONDS, settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def record_write(user_id: Optional[int]) -> None:
+    """Pin user to the primary for READ_YOUR_WRITES_SECONDS after a write, in every worker"""
+    if user_id is None or replica_engine is None:
+        return
+    now = time.monotonic()
+    _recent_writers[user_id] = now
+
+    # Drop expired entries so the map stays bounded by active writers
+    if len(_recent_writers) > 10000:
+        cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+        for stale_id in [uid for uid, ts in _recent_writers.items() if ts < cutoff]:
+            _recent_writers.pop(stale_id, None)
+
+    store = _writers_store()
+    if store is None or now < _writers_redis["retry_at"]:
+        return
+    try:
+        # Blocking client, kept off the event loop
+        await asyncio.to_thread(
+            store.set, f"rw:{user_id}", 1, px=int(settings.READ_YOUR_WRITES_SECONDS * 1000)
+        )
+    except Exception as e:
+        _writers_store_failed(e)
+
+
+def _wrote_recently(user_id: Optional[int]) -> bool:
+    if user_id is None:
+        return False
+    written_at = _recent_writers.get(user_id)
+    if written_at is not None and time.monotonic() - written_at < settings.READ_YOUR_WRITES_SECONDS:
+        return True
+
+    # The write may have gone through another worker
+    store = _writers_store()
+    if store is None:
+        return False
+    if time.monotonic() < _writers_redis["primary_until"]:
+        # Store failed recently: without the marks we cannot rule out a recent write
+        return True
+    try:
+        return bool(store.exists(f"rw:{user_id}"))
+    except Exception as e:
+        _writers_store_failed(e)
+        return True
+
+
+def _measure_replica_lag() -> Optional[float]:
+    """Return replica lag in seconds, or None if it cannot be determined"""
+    if replica_engine.dialect.name != "postgresql":
+        # No replication lag to measure (e.g. SQLite copy used in development)
+        return 0.0
+
+    with replica_engine.connect() as conn:
+        lag = conn.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )).scalar()
+    return float(lag) if lag is not None else 0.0
+
+
+def _replica_is_fresh() -> bool:
+    """Check replica lag at most once per DATABASE_REPLICA_LAG_CHECK_INTERVAL"""
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_state["fresh"]
+
+    try:
+        lag = _measure_replica_lag()
+        fresh = lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        if not fresh:
+            logger.warning("Replica lagging, routing reads to primary", lag_seconds=lag)
+    except Exception as e:
+        logger.warning(f"Replica lag check failed: {e}")
+        fresh = False
+
+    _replica_state["checked_at"] = now
+    _replica_state["fresh"] = fresh
+    return fresh
+
+
+def get_read_session(user_id: Optional[int] = None) -> Session:
+    """
+    Open a session for read-only work.
+
+    Uses the replica when one is configured and fresh, unless the user
+    has written recently and must see their own writes.
+    """
+    if ReplicaSessionLocal is not None and not _wrote_recently(user_id) and _replica_is_fresh():
+        return ReplicaSessionLocal()
+    return SessionLocal()
+
+
 async def init_db():
     """Initialize database tables"""
     from app.models.user import User
     from app.models.workout import Exercise, Workout, WorkoutExercise
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    from app.models.catalog import CatalogChecksum
+
+    # Create all tables (blocking DDL, kept off the event loop)
+    await asyncio.to_thread(Base.metadata.create_all, bind=engine)
@@ -0,0 +1,179 @@
+"""
+SQL query instrumentation
+"""
+
+import hashlib
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import create_counter, create_histogram, route_template
+
+logger = structlog.get_logger()
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+ROWS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+DB_QUERY_LATENCY = create_histogram(
+    'db_query_duration_seconds', 'SQL statement latency',
+    ['database', 'operation', 'table', 'fingerprint'], buckets=QUERY_BUCKETS
+)
+DB_QUERY_ROWS = create_histogram(
+    'db_query_rows', 'Rows returned or affected by a SQL statement',
+    ['database', 'operation', 'table', 'fingerprint'], buckets=ROWS_BUCKETS
+)
+DB_QUERY_ERRORS = create_counter('db_query_errors_total', 'Failed SQL statements', ['database', 'operation', 'table'])
+DB_QUERIES_PER_REQUEST = create_histogram(
+    'db_queries_per_request', 'SQL statements executed per HTTP request',
+    ['endpoint'], buckets=QUERIES_PER_REQUEST_BUCKETS
+)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+\"?(\w+)", re.IGNORECASE)
+
+_MAX_LOGGED_STATEMENT = 1000
+
+
+class StatementFingerprint(NamedTuple):
+    """Normalized statement identity used as metric labels"""
+    id: str
+    operation: str
+    table: str
+    normalized: str
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> StatementFingerprint:
+    """Strip literals and bind parameters so equivalent statements share one fingerprint"""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?)", normalized)
+    normalized = _SPACE_RE.sub(" ", normalized).strip()
+
+    operation = normalized.split(" ", 1)[0].upper() if normalized else "UNKNOWN"
+    table = _TABLE_RE.search(normalized)
+    return StatementFingerprint(
+        id=hashlib.sha1(normalized.encode()).hexdigest()[:12],
+        operation=operation,
+        table=table.group(1) if table else "",
+        normalized=normalized,
+    )
+
+
+class RequestQueryStats:
+    """Statements executed while serving one HTTP request"""
+
+    __slots__ = ("scope", "count", "duration", "rows")
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+
+    @property
+    def route(self) -> str:
+        # The router writes the matched route into the shared scope
+        return route_template(self.scope)
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("db_request_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attach timing listeners to an engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        # DBAPIs report -1 when the row count is unknown (e.g. SELECT on SQLite)
+        rows = max(cursor.rowcount, 0) if cursor.rowcount is not None else 0
+        _record(name, statement, duration, rows)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        if context.statement:
+            fp = fingerprint(context.statement)
+            DB_QUERY_ERRORS.labels(database=name, operation=fp.operation, table=fp.table).inc()
+
+
+def _record(database: str, statement: str, duration: float, rows: int) -> None:
+    fp = fingerprint(statement)
+    labels = {"database": database, "operation": fp.operation, "table": fp.table, "fingerprint": fp.id}
+    DB_QUERY_LATENCY.labels(**labels).observe(duration)
+    DB_QUERY_ROWS.labels(**labels).observe(rows)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+        stats.rows += rows
+
+    if duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query",
+            duration_ms=round(duration * 1000, 1),
+            database=database,
+            fingerprint=fp.id,
+            rows=rows,
+            route=stats.route if stats is not None else None,
+            statement=fp.normalized[:_MAX_LOGGED_STATEMENT],
+        )
+
+
+class QueryStatsMiddleware:
+    """
+    Collects per-request query totals.
+
+    Adds a Server-Timing header outside production so the browser dev
+    tools show how much of a request was spent in the database.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if self.server_timing and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries, {stats.rows} rows"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            DB_QUERIES_PER_REQUEST.labels(endpoint=stats.route).observe(stats.count)
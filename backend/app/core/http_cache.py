@@ -0,0 +1,44 @@
+"""
+Conditional GET helpers: ETag, If-None-Match and Cache-Control
+"""
+
+import hashlib
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Catalog data that only changes on deploy or import
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+# Shared data refreshed in the background (exercise catalog)
+CATALOG_CACHE_CONTROL = "public, max-age=300"
+# Per-user data: may be stored, but must be revalidated with the ETag every time
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag from version stamps (counters, max ids) rather than from the body
+
+    Parts must identify the representation: resource name, owner and version.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes (added by proxies) are ignored"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
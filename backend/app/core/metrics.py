@@ -0,0 +1,113 @@
+"""
+Prometheus metrics helpers
+"""
+
+import os
+import time
+from typing import Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request latency: fast DB-backed reads up to slow AI generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+
+# Prometheus metrics with duplicate check
+def create_counter(name, description, labels):
+    # Check if counter already exists
+    try:
+        return REGISTRY._names_to_collectors[name]
+    except KeyError:
+        return Counter(name, description, labels)
+
+
+def create_histogram(name, description, labels: Sequence[str] = (), buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS):
+    # Check if histogram already exists
+    try:
+        return REGISTRY._names_to_collectors[name]
+    except KeyError:
+        return Histogram(name, description, labels, buckets=buckets)
+
+
+def create_gauge(name, description, labels: Sequence[str] = (), multiprocess_mode: str = "livesum"):
+    # Check if gauge already exists
+    try:
+        return REGISTRY._names_to_collectors[name]
+    except KeyError:
+        return Gauge(name, description, labels, multiprocess_mode=multiprocess_mode)
+
+
+REQUEST_COUNT = create_counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
+REQUEST_LATENCY = create_histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['method', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = create_gauge('http_requests_in_progress', 'HTTP requests being processed', ['method'])
+RESPONSE_SIZE = create_histogram(
+    'http_response_size_bytes', 'HTTP response body size', ['method', 'endpoint'], buckets=SIZE_BUCKETS
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Templated route path (e.g. /api/v1/workouts/{workout_id}) to keep label cardinality bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition for /metrics; aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop live gauge values of this worker from the multiprocess directory on shutdown"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """Records count, latency, in-flight requests and response size per templated route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            endpoint = route_template(scope)
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
+            REQUEST_LATENCY.labels(method=method, endpoint=endpoint).observe(duration)
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
@@ -0,0 +1,234 @@
+"""
+Rate limiting with token buckets
+"""
+
+import math
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import create_counter
+
+logger = structlog.get_logger()
+
+RATE_LIMIT_REJECTIONS = create_counter(
+    'rate_limit_rejections_total',
+    'Requests rejected by the rate limiter',
+    ['route', 'scope']
+)
+
+
+class RateLimit(NamedTuple):
+    """Bucket of `capacity` tokens refilled evenly over `period` seconds"""
+    capacity: int
+    period: float = 60.0
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+class RouteLimits(NamedTuple):
+    """Limits applied to one route"""
+    per_user: Optional[RateLimit] = None
+    overall: Optional[RateLimit] = None
+
+
+class TokenBucket:
+    """Classic token bucket"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Take tokens; return 0 on success, otherwise seconds until `cost` tokens are available"""
+        self.refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    @property
+    def is_full(self) -> bool:
+        self.refill()
+        return self.tokens >= self.capacity
+
+
+class InMemoryBucketStore:
+    """
+    Per-process bucket store.
+
+    take() never awaits, so each check-and-update runs atomically on the
+    event loop and no lock is needed.
+    """
+
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._evict_idle()
+            bucket = self._buckets[key] = TokenBucket(limit.capacity, limit.rate)
+        return bucket.take()
+
+    def _evict_idle(self) -> None:
+        # A full bucket is indistinguishable from a new one, so it can be dropped
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_full]:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_buckets:
+            for key in list(self._buckets)[: self.max_buckets // 2]:
+                del self._buckets[key]
+
+
+# KEYS[1] - bucket key; ARGV - capacity, rate (tokens/sec), cost. Returns wait seconds.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Bucket store shared by all workers; the bucket update runs as one Lua script"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        try:
+            wait = await self._script(keys=[f"ratelimit:{key}"], args=[limit.capacity, limit.rate, 1])
+            return float(wait)
+        except Exception as e:
+            # Fail open: Redis outage must not take the API down
+            logger.warning(f"Rate limit store unavailable: {e}")
+            return 0.0
+
+
+def create_bucket_store():
+    """Build the store selected by RATE_LIMIT_BACKEND"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisBucketStore(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, using in-memory rate limiting")
+    return InMemoryBucketStore()
+
+
+def default_rate_limits(prefix: str = "") -> Dict[Tuple[str, str], RouteLimits]:
+    """Limits for expensive routes, keyed by (method, path)"""
+    ai_limits = RouteLimits(
+        per_user=RateLimit(settings.RATE_LIMIT_AI_PER_MINUTE),
+        overall=RateLimit(settings.RATE_LIMIT_AI_GLOBAL_PER_MINUTE),
+    )
+    auth_limits = RouteLimits(
+        per_user=RateLimit(settings.RATE_LIMIT_AUTH_PER_MINUTE),
+        overall=RateLimit(settings.RATE_LIMIT_AUTH_GLOBAL_PER_MINUTE),
+    )
+    return {
+        ("POST", f"{prefix}/ai/generate-workout"): ai_limits,
+        ("POST", f"{prefix}/ai/generate-meal-plan"): ai_limits,
+        ("POST", f"{prefix}/auth/telegram/auth"): auth_limits,
+    }
+
+
+def client_identity(scope: Scope) -> str:
+    """Telegram user from a valid bearer token, otherwise the client IP"""
+    headers = Headers(scope=scope)
+
+    scheme, _, token = (headers.get("authorization") or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        # Imported lazily to avoid a circular import with the API package
+        from app.api.v1.endpoints.auth import verify_token
+
+        telegram_id = verify_token(token.strip())
+        if telegram_id:
+            return f"tg:{telegram_id}"
+
+    # X-Forwarded-For is client-controlled; only the entries appended by our
+    # own TRUSTED_PROXY_COUNT proxies can be believed. Otherwise rely on
+    # scope["client"], which uvicorn --proxy-headers rewrites for trusted proxies.
+    if settings.TRUSTED_PROXY_COUNT > 0:
+        hops = [hop.strip() for hop in (headers.get("x-forwarded-for") or "").split(",") if hop.strip()]
+        if len(hops) >= settings.TRUSTED_PROXY_COUNT:
+            return f"ip:{hops[-settings.TRUSTED_PROXY_COUNT]}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying per-user and per-route token buckets"""
+
+    def __init__(self, app: ASGIApp, store, limits: Dict[Tuple[str, str], RouteLimits]):
+        self.app = app
+        self.store = store
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        route_limits = self.limits.get((scope["method"], path))
+        if route_limits is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route_limits.per_user:
+            wait = await self.store.take(f"user:{path}:{client_identity(scope)}", route_limits.per_user)
+            if wait > 0:
+                await self._reject(scope, receive, send, path, "user", wait)
+                return
+
+        if route_limits.overall:
+            wait = await self.store.take(f"route:{path}", route_limits.overall)
+            if wait > 0:
+                await self._reject(scope, receive, send, path, "global", wait)
+                return
+
+        await self.app(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, path: str, limit_scope: str, wait: float):
+        RATE_LIMIT_REJECTIONS.labels(route=path, scope=limit_scope).inc()
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(max(1, math.ceil(wait)))}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,65 @@
+"""
+Fast JSON responses
+"""
+
+from decimal import Decimal
+from typing import Any, Optional
+
+from pydantic import BaseModel, TypeAdapter
+import pydantic_core
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional, see requirements-prod.txt
+    orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+    """Types orjson does not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON; datetime, date, UUID and Enum are handled natively"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    # Without orjson fall back to pydantic-core, which is always installed and still native
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the application
+
+    Renders with orjson when installed, otherwise with pydantic-core.
+    Endpoints returning large payloads should return it directly, which
+    also skips FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    background: Optional[BackgroundTask] = None
+) -> Response:
+    """
+    Validate ORM objects against a response model and serialize them in one pass
+
+    FastAPI would validate into models, dump them back to dicts and encode
+    those again; TypeAdapter.dump_json goes straight to bytes in pydantic-core.
+    Keep response_model on the route for the OpenAPI schema.
+    """
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(body, status_code=status_code, media_type="application/json", background=background)
@@ -4,5 +4,6 @@ Database models for AIGym Coach MVP
 
 from .user import User
 from .workout import Workout, Exercise, WorkoutExercise
+from .catalog import CatalogChecksum
 
-__all__ = ["User", "Workout", "Exercise", "WorkoutExercise"] 
\ No newline at end of file
+__all__ = ["User", "Workout", "Exercise", "WorkoutExercise", "CatalogChecksum"] 
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+Reference data bookkeeping models for MVP
+"""
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class CatalogChecksum(Base):
+    """Checksum of the last seeded/imported reference data set"""
+    __tablename__ = "catalog_checksums"
+
+    name = Column(String(200), primary_key=True)  # 'basic_exercises', 'import:library.csv'
+    checksum = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -39,7 +39,7 @@ class Workout(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    exercises = relationship("WorkoutExercise", back_populates="workout")
+    exercises = relationship("WorkoutExercise", back_populates="workout", order_by="WorkoutExercise.order")
 
 
 class WorkoutExercise(Base):
@@ -4,9 +4,9 @@ AI Service для генерации тренировок через Google Gemi
 
 import os
 import json
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import google.generativeai as genai
 from pydantic import BaseModel
 import structlog
 
@@ -53,15 +53,45 @@ class Workout(BaseModel):
 
 class GeminiAIService:
     def __init__(self, api_key: Optional[str] = None):
-        """Инициализация Gemini AI сервиса"""
+        """
+        Инициализация Gemini AI сервиса
+
+        SDK Gemini тяжелый, поэтому он импортируется и модель создается
+        при первом обращении к model (или в warmup() после старта), а не
+        при импорте модуля.
+        """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._model = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._model = self._create_model()
+                    self._initialized = True
+        return self._model
+
+    def _create_model(self):
         if not self.api_key:
             logger.warning("Gemini API key not configured")
-            self.model = None
-        else:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-            logger.info("Gemini AI service initialized")
+            return None
+        try:
+            import google.generativeai as genai
+        except ImportError as e:
+            logger.error(f"Gemini SDK not available: {e}")
+            return None
+
+        genai.configure(api_key=self.api_key)
+        model = genai.GenerativeModel('gemini-pro')
+        logger.info("Gemini AI service initialized")
+        return model
+
+    def warmup(self) -> None:
+        """Импортировать SDK и создать модель заранее, чтобы первый запрос не ждал"""
+        self.model
 
     def generate_workout(self, user_profile: UserProfile) -> Optional[Workout]:
         """Генерация персонализированной тренировки"""
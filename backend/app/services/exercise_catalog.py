@@ -0,0 +1,145 @@
+"""
+In-memory exercise catalog for MVP
+"""
+
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+import structlog
+
+from app.core.config import settings
+from app.models.catalog import CatalogChecksum
+from app.models.workout import Exercise
+
+logger = structlog.get_logger()
+
+INDEXED_FIELDS = ("muscle_group", "equipment", "difficulty")
+
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable view of the catalog; replaced as a whole on refresh"""
+    version: Tuple
+    by_id: Dict[int, Exercise]
+    ordered_ids: Tuple[int, ...]
+    # field -> value -> ids of active exercises
+    indexes: Dict[str, Dict[str, FrozenSet[int]]]
+    # Digest of the served fields; catches in-place edits the version stamp misses (ETags)
+    content_hash: str
+
+
+_EMPTY_SNAPSHOT = CatalogSnapshot(
+    version=(), by_id={}, ordered_ids=(), indexes={field: {} for field in INDEXED_FIELDS}, content_hash=""
+)
+
+
+class ExerciseCatalog:
+    """Active exercises kept in process with inverted indexes by muscle group, equipment and difficulty"""
+
+    def __init__(self, refresh_interval: float = settings.EXERCISE_CATALOG_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Tuple:
+        return self._snapshot.version
+
+    @staticmethod
+    def read_version(db: Session) -> Tuple:
+        """
+        Cheap stamp that changes whenever exercises are added, removed, (de)activated
+        or edited by a seed/import (which stamp CatalogChecksum.updated_at)
+        """
+        last_import = select(func.max(CatalogChecksum.updated_at)).scalar_subquery()
+        count, max_id, active, imported_at = db.query(
+            func.count(Exercise.id),
+            func.max(Exercise.id),
+            func.sum(case((Exercise.is_active == True, 1), else_=0)),
+            last_import
+        ).one()
+        return (count, max_id, active or 0, imported_at)
+
+    def load(self, db: Session) -> None:
+        """Load active exercises and rebuild indexes"""
+        with self._lock:
+            version = self.read_version(db)
+            rows = db.query(Exercise).filter(Exercise.is_active == True).order_by(Exercise.id).all()
+
+            indexes: Dict[str, Dict[str, set]] = {field: {} for field in INDEXED_FIELDS}
+            for exercise in rows:
+                # Detached rows keep their loaded attributes and are shared read-only
+                db.expunge(exercise)
+                for field in INDEXED_FIELDS:
+                    value = getattr(exercise, field)
+                    if value is not None:
+                        indexes[field].setdefault(value, set()).add(exercise.id)
+
+            self._snapshot = CatalogSnapshot(
+                version=version,
+                by_id={exercise.id: exercise for exercise in rows},
+                ordered_ids=tuple(exercise.id for exercise in rows),
+                indexes={
+                    field: {value: frozenset(ids) for value, ids in values.items()}
+                    for field, values in indexes.items()
+                },
+                content_hash=hashlib.blake2b(repr([
+                    (e.id, e.name, e.description, e.muscle_group, e.equipment, e.difficulty) for e in rows
+                ]).encode(), digest_size=8).hexdigest(),
+            )
+            self._loaded = True
+            self._checked_at = time.monotonic()
+        logger.info("Exercise catalog loaded", exercises=len(rows), version=version)
+
+    def invalidate(self) -> None:
+        """Force reload on next access (after seeding or imports in this process)"""
+        self._loaded = False
+
+    def ensure_fresh(self, db: Session) -> CatalogSnapshot:
+        """Reload when the version stamp changed; the stamp is checked at most once per refresh interval"""
+        if not self._loaded:
+            self.load(db)
+        elif time.monotonic() - self._checked_at > self.refresh_interval:
+            self._checked_at = time.monotonic()
+            if self.read_version(db) != self._snapshot.version:
+                self.load(db)
+        return self._snapshot
+
+    def get(self, db: Session, exercise_id: int) -> Optional[Exercise]:
+        return self.ensure_fresh(db).by_id.get(exercise_id)
+
+    def find(
+        self,
+        db: Session,
+        muscle_group: Optional[str] = None,
+        equipment: Optional[str] = None,
+        difficulty: Optional[str] = None
+    ) -> List[Exercise]:
+        """Filtered lookup as an intersection of index sets, ordered by id"""
+        snapshot = self.ensure_fresh(db)
+        filters = (("muscle_group", muscle_group), ("equipment", equipment), ("difficulty", difficulty))
+        id_sets = [snapshot.indexes[field].get(value, frozenset()) for field, value in filters if value]
+
+        if not id_sets:
+            ids = snapshot.ordered_ids
+        else:
+            id_sets.sort(key=len)
+            ids = sorted(id_sets[0].intersection(*id_sets[1:]))
+        return [snapshot.by_id[exercise_id] for exercise_id in ids]
+
+    def sample(self, db: Session, muscle_group: str, count: int) -> List[Exercise]:
+        """Random exercises of a muscle group without touching the DB"""
+        snapshot = self.ensure_fresh(db)
+        ids = snapshot.indexes["muscle_group"].get(muscle_group, frozenset())
+        picked = random.sample(sorted(ids), min(count, len(ids)))
+        return [snapshot.by_id[exercise_id] for exercise_id in picked]
+
+
+# Shared catalog instance
+exercise_catalog = ExerciseCatalog()
@@ -0,0 +1,135 @@
+"""
+Full-text and fuzzy search over the exercise catalog
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.workout import Exercise
+from app.services.exercise_catalog import CatalogSnapshot, exercise_catalog
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights: a hit in the name matters more than in the description
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Match quality for a single query token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+
+# Minimal trigram similarity (as in pg_trgm) for a typo-tolerant match
+SIMILARITY_THRESHOLD = 0.3
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words; ё is folded into е for Russian"""
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseSearchIndex:
+    """Inverted index with a sorted vocabulary for prefixes and trigrams for typos"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.exercises = snapshot.by_id
+        # token -> exercise id -> best field weight
+        self.postings: Dict[str, Dict[int, float]] = {}
+
+        for exercise in snapshot.by_id.values():
+            for text, weight in ((exercise.name, NAME_WEIGHT), (exercise.description, DESCRIPTION_WEIGHT)):
+                for token in normalize(text or ""):
+                    docs = self.postings.setdefault(token, {})
+                    docs[exercise.id] = max(docs.get(exercise.id, 0.0), weight)
+
+        self.vocabulary = sorted(self.postings)
+        self.token_trigrams = {token: trigrams(token) for token in self.vocabulary}
+        self.trigram_tokens: Dict[str, Set[str]] = {}
+        for token, grams in self.token_trigrams.items():
+            for gram in grams:
+                self.trigram_tokens.setdefault(gram, set()).add(token)
+
+    def _prefix_matches(self, prefix: str) -> List[str]:
+        start = bisect_left(self.vocabulary, prefix)
+        matches = []
+        for token in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy_matches(self, token: str) -> List[Tuple[str, float]]:
+        query_grams = trigrams(token)
+        overlap: Dict[str, int] = {}
+        for gram in query_grams:
+            for candidate in self.trigram_tokens.get(gram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+
+        matches = []
+        for candidate, shared in overlap.items():
+            similarity = shared / (len(query_grams) + len(self.token_trigrams[candidate]) - shared)
+            if similarity >= SIMILARITY_THRESHOLD:
+                matches.append((candidate, similarity))
+        return matches
+
+    def _token_matches(self, token: str) -> Dict[str, float]:
+        """Vocabulary tokens matching a query token with their match score"""
+        matches: Dict[str, float] = {}
+        for candidate, similarity in self._fuzzy_matches(token):
+            matches[candidate] = FUZZY_SCORE * similarity
+        for candidate in self._prefix_matches(token):
+            # Shorter completions are closer to what the user typed
+            matches[candidate] = PREFIX_SCORE * (0.5 + 0.5 * len(token) / len(candidate))
+        if token in self.postings:
+            matches[token] = EXACT_SCORE
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Exercise]:
+        """Ranked exercises; every query token may match exactly, as a prefix or with typos"""
+        scores: Dict[int, float] = {}
+        matched_tokens: Dict[int, int] = {}
+
+        for token in dict.fromkeys(normalize(query)):
+            best: Dict[int, float] = {}
+            for candidate, match_score in self._token_matches(token).items():
+                for exercise_id, weight in self.postings[candidate].items():
+                    score = match_score * weight
+                    if score > best.get(exercise_id, 0.0):
+                        best[exercise_id] = score
+            for exercise_id, score in best.items():
+                scores[exercise_id] = scores.get(exercise_id, 0.0) + score
+                matched_tokens[exercise_id] = matched_tokens.get(exercise_id, 0) + 1
+
+        ranked = sorted(
+            scores,
+            key=lambda exercise_id: (-matched_tokens[exercise_id], -scores[exercise_id], self.exercises[exercise_id].name)
+        )
+        return [self.exercises[exercise_id] for exercise_id in ranked[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def search_exercises(db: Session, query: str, limit: int = 20) -> List[Exercise]:
+    """Search the catalog, rebuilding the index whenever the catalog is reloaded"""
+    global _index
+    snapshot = exercise_catalog.ensure_fresh(db)
+    index = _index
+    if index is None or index.snapshot is not snapshot:
+        with _index_lock:
+            if _index is None or _index.snapshot is not snapshot:
+                _index = ExerciseSearchIndex(snapshot)
+            index = _index
+    return index.search(query, limit)
@@ -2,9 +2,91 @@
 Exercise service for MVP
 """
 
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
+from app.models.catalog import CatalogChecksum
 from app.models.workout import Exercise
-from typing import List, Optional
+from app.services.exercise_catalog import exercise_catalog
+from app.services.exercise_search import search_exercises
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+EXERCISE_FIELDS = ("name", "description", "muscle_group", "equipment", "difficulty")
+IMPORT_BATCH_SIZE = 500
+
+# Basic exercises for MVP
+BASIC_EXERCISES = [
+    # Chest exercises
+    {"name": "Push-ups", "muscle_group": "chest", "equipment": "bodyweight", "difficulty": "beginner"},
+    {"name": "Bench Press", "muscle_group": "chest", "equipment": "barbell", "difficulty": "intermediate"},
+    {"name": "Dumbbell Flyes", "muscle_group": "chest", "equipment": "dumbbell", "difficulty": "intermediate"},
+
+    # Back exercises
+    {"name": "Pull-ups", "muscle_group": "back", "equipment": "bodyweight", "difficulty": "intermediate"},
+    {"name": "Bent-over Rows", "muscle_group": "back", "equipment": "barbell", "difficulty": "intermediate"},
+    {"name": "Lat Pulldowns", "muscle_group": "back", "equipment": "machine", "difficulty": "beginner"},
+
+    # Legs exercises
+    {"name": "Squats", "muscle_group": "legs", "equipment": "bodyweight", "difficulty": "beginner"},
+    {"name": "Deadlifts", "muscle_group": "legs", "equipment": "barbell", "difficulty": "advanced"},
+    {"name": "Lunges", "muscle_group": "legs", "equipment": "bodyweight", "difficulty": "beginner"},
+
+    # Shoulders exercises
+    {"name": "Overhead Press", "muscle_group": "shoulders", "equipment": "barbell", "difficulty": "intermediate"},
+    {"name": "Lateral Raises", "muscle_group": "shoulders", "equipment": "dumbbell", "difficulty": "beginner"},
+
+    # Arms exercises
+    {"name": "Bicep Curls", "muscle_group": "arms", "equipment": "dumbbell", "difficulty": "beginner"},
+    {"name": "Tricep Dips", "muscle_group": "arms", "equipment": "bodyweight", "difficulty": "intermediate"},
+]
+
+
+def catalog_checksum(rows: List[Dict[str, Any]]) -> str:
+    """Stable checksum of an exercise data set"""
+    payload = json.dumps(rows, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_checksum(path: str) -> str:
+    """Checksum of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_exercise_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream exercise rows from a .csv, .jsonl/.ndjson or .json (array) file"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            yield from csv.DictReader(f)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == ".json":
+            # Plain JSON arrays cannot be streamed with the standard library
+            yield from json.load(f)
+        else:
+            raise ValueError(f"Unsupported exercise file format: {extension}")
+
+
+def _clean_exercise_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Keep known fields, strip strings, drop rows without a name"""
+    cleaned = {}
+    for field in EXERCISE_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is not None:
+            cleaned[field] = value
+    return cleaned if cleaned.get("name") else None
 
 
 class ExerciseService:
@@ -22,73 +104,125 @@ class ExerciseService:
         offset: int = 0
     ) -> List[Exercise]:
         """Get exercises with filters"""
-        query = self.db.query(Exercise).filter(Exercise.is_active == True)
-        
-        if muscle_group:
-            query = query.filter(Exercise.muscle_group == muscle_group)
-        
-        if equipment:
-            query = query.filter(Exercise.equipment == equipment)
-        
-        if difficulty:
-            query = query.filter(Exercise.difficulty == difficulty)
-        
-        return query.offset(offset).limit(limit).all()
+        exercises = exercise_catalog.find(self.db, muscle_group, equipment, difficulty)
+        return exercises[offset:offset + limit]
+    
+    def search_exercises(self, query: str, limit: int = 20) -> List[Exercise]:
+        """Search exercises by name and description (prefix and typo tolerant)"""
+        return search_exercises(self.db, query, limit)
     
     def get_exercise_by_id(self, exercise_id: int) -> Exercise:
         """Get exercise by ID"""
+        exercise = exercise_catalog.get(self.db, exercise_id)
+        if exercise:
+            return exercise
+        # Inactive exercises are not kept in the catalog
         return self.db.query(Exercise).filter(Exercise.id == exercise_id).first()
     
     def get_exercises_by_muscle_group(self, muscle_group: str, limit: int = 10) -> List[Exercise]:
         """Get exercises by muscle group"""
-        return self.db.query(Exercise).filter(
-            Exercise.muscle_group == muscle_group,
-            Exercise.is_active == True
-        ).limit(limit).all()
+        return exercise_catalog.find(self.db, muscle_group=muscle_group)[:limit]
     
     def get_random_exercises(self, muscle_groups: List[str], count: int = 5) -> List[Exercise]:
         """Get random exercises for muscle groups"""
-        import random
-        
         exercises = []
         for muscle_group in muscle_groups:
-            muscle_exercises = self.get_exercises_by_muscle_group(muscle_group, count * 2)
-            if muscle_exercises:
-                exercises.extend(random.sample(muscle_exercises, min(count, len(muscle_exercises))))
+            exercises.extend(exercise_catalog.sample(self.db, muscle_group, count))
         
         return exercises[:count]
     
-    def seed_basic_exercises(self):
-        """Seed basic exercises for MVP"""
-        basic_exercises = [
-            # Chest exercises
-            {"name": "Push-ups", "muscle_group": "chest", "equipment": "bodyweight", "difficulty": "beginner"},
-            {"name": "Bench Press", "muscle_group": "chest", "equipment": "barbell", "difficulty": "intermediate"},
-            {"name": "Dumbbell Flyes", "muscle_group": "chest", "equipment": "dumbbell", "difficulty": "intermediate"},
-            
-            # Back exercises
-            {"name": "Pull-ups", "muscle_group": "back", "equipment": "bodyweight", "difficulty": "intermediate"},
-            {"name": "Bent-over Rows", "muscle_group": "back", "equipment": "barbell", "difficulty": "intermediate"},
-            {"name": "Lat Pulldowns", "muscle_group": "back", "equipment": "machine", "difficulty": "beginner"},
-            
-            # Legs exercises
-            {"name": "Squats", "muscle_group": "legs", "equipment": "bodyweight", "difficulty": "beginner"},
-            {"name": "Deadlifts", "muscle_group": "legs", "equipment": "barbell", "difficulty": "advanced"},
-            {"name": "Lunges", "muscle_group": "legs", "equipment": "bodyweight", "difficulty": "beginner"},
-            
-            # Shoulders exercises
-            {"name": "Overhead Press", "muscle_group": "shoulders", "equipment": "barbell", "difficulty": "intermediate"},
-            {"name": "Lateral Raises", "muscle_group": "shoulders", "equipment": "dumbbell", "difficulty": "beginner"},
-            
-            # Arms exercises
-            {"name": "Bicep Curls", "muscle_group": "arms", "equipment": "dumbbell", "difficulty": "beginner"},
-            {"name": "Tricep Dips", "muscle_group": "arms", "equipment": "bodyweight", "difficulty": "intermediate"},
-        ]
+    def seed_basic_exercises(self) -> int:
+        """Seed basic exercises for MVP; skipped when the seed data checksum is unchanged"""
+        checksum = catalog_checksum(BASIC_EXERCISES)
+        if self._get_checksum("basic_exercises") == checksum:
+            return 0
+        
+        inserted, _ = self.upsert_exercises(BASIC_EXERCISES)
+        self._set_checksum("basic_exercises", checksum)
+        self.db.commit()
+        exercise_catalog.invalidate()
+        return inserted
+    
+    def upsert_exercises(self, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Insert new exercises and update changed ones by name.
+        
+        One query loads matching rows, then one bulk INSERT and one bulk
+        UPDATE are issued. Only fields present in a row are compared and
+        updated. Does not commit.
+        
+        Returns:
+            (inserted, updated) counts
+        """
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            cleaned = _clean_exercise_row(row)
+            if cleaned:
+                by_name[cleaned["name"]] = cleaned
+        if not by_name:
+            return 0, 0
+        
+        columns = [getattr(Exercise, field) for field in EXERCISE_FIELDS]
+        existing = {
+            record.name: record
+            for record in self.db.query(Exercise.id, *columns).filter(Exercise.name.in_(list(by_name)))
+        }
+        
+        new_rows = []
+        changed_rows = []
+        for name, row in by_name.items():
+            record = existing.get(name)
+            if record is None:
+                new_rows.append(row)
+            elif any(getattr(record, field) != value for field, value in row.items()):
+                changed_rows.append({"id": record.id, **row})
+        
+        if new_rows:
+            self.db.execute(insert(Exercise), new_rows)
+        if changed_rows:
+            self.db.execute(update(Exercise), changed_rows)
+        return len(new_rows), len(changed_rows)
+    
+    def import_exercises(self, rows: Iterable[Dict[str, Any]], batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+        """Import a stream of exercise rows in bulk batches within one transaction"""
+        totals = {"inserted": 0, "updated": 0}
+        batch: List[Dict[str, Any]] = []
         
-        for exercise_data in basic_exercises:
-            existing = self.db.query(Exercise).filter(Exercise.name == exercise_data["name"]).first()
-            if not existing:
-                exercise = Exercise(**exercise_data)
-                self.db.add(exercise)
+        def flush_batch():
+            inserted, updated = self.upsert_exercises(batch)
+            totals["inserted"] += inserted
+            totals["updated"] += updated
+            batch.clear()
         
-        self.db.commit() 
\ No newline at end of file
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush_batch()
+        if batch:
+            flush_batch()
+        return totals
+    
+    def import_exercise_file(self, path: str, force: bool = False) -> Optional[Dict[str, int]]:
+        """Import an exercise library file; returns None when it was already imported unchanged"""
+        name = f"import:{os.path.basename(path)}"
+        checksum = file_checksum(path)
+        if not force and self._get_checksum(name) == checksum:
+            return None
+        
+        try:
+            totals = self.import_exercises(iter_exercise_file(path))
+            self._set_checksum(name, checksum)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        exercise_catalog.invalidate()
+        return totals
+    
+    def _get_checksum(self, name: str) -> Optional[str]:
+        return self.db.query(CatalogChecksum.checksum).filter(CatalogChecksum.name == name).scalar()
+    
+    def _set_checksum(self, name: str, checksum: str) -> None:
+        # Set explicitly (with microseconds) even when the checksum is unchanged:
+        # running catalogs in other processes reload when this value moves
+        self.db.merge(CatalogChecksum(name=name, checksum=checksum, updated_at=datetime.utcnow()))
@@ -6,24 +6,38 @@ import hashlib
 import hmac
 import time
 import json
-from typing import Optional, Dict, Any
-from urllib.parse import parse_qs
+from functools import lru_cache
+from typing import Optional, Dict, Any, Sequence, Tuple
+from urllib.parse import parse_qsl
 import structlog
 
+from app.core.cache import TTLCache
+
 logger = structlog.get_logger()
 
+# initData действительны 24 часа
+INIT_DATA_TTL_SECONDS = 86400
+
 
 class TelegramAuthService:
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, extra_bot_tokens: Sequence[str] = ()):
         """
         Инициализация сервиса авторизации
         
         Args:
             bot_token: Токен бота из BotFather
+            extra_bot_tokens: Дополнительные боты (например, staging), чьи initData тоже принимаются
         """
         self.bot_token = bot_token
         # Создаем секретный ключ для валидации
         self.secret_key = hashlib.sha256(bot_token.encode()).digest()
+        # Секрет WebAppData вычисляется один раз для каждого токена бота
+        self.webapp_secrets = [
+            hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+            for token in dict.fromkeys((bot_token, *extra_bot_tokens)) if token
+        ]
+        # sha256(initData) -> результат валидации, хранится до истечения auth_date
+        self._validated = TTLCache(maxsize=10000)
 
     def validate_init_data(self, init_data: str) -> Optional[Dict[str, Any]]:
         """
@@ -35,69 +49,67 @@ class TelegramAuthService:
         Returns:
             Словарь с данными пользователя если валидация прошла успешно
         """
+        cache_key = hashlib.sha256(init_data.encode()).digest()
+        cached = self._validated.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Парсим данные
-            parsed_data = parse_qs(init_data)
+            # Парсим данные за один проход, отделяя hash
+            received_hash = None
+            fields: Dict[str, str] = {}
+            for key, value in parse_qsl(init_data):
+                if key == 'hash':
+                    received_hash = received_hash or value
+                else:
+                    fields.setdefault(key, value)
             
-            # Извлекаем hash
-            received_hash = parsed_data.get('hash', [None])[0]
             if not received_hash:
                 logger.warning("No hash in init data")
                 return None
             
             # Создаем строку для проверки (без hash параметра)
-            data_check_arr = []
-            for key, values in parsed_data.items():
-                if key != 'hash':
-                    data_check_arr.append(f"{key}={values[0]}")
-            
-            # Сортируем и объединяем
-            data_check_arr.sort()
-            data_check_string = '\n'.join(data_check_arr)
-            
-            # Вычисляем hash
-            secret_key = hmac.new(
-                b"WebAppData",
-                self.bot_token.encode(),
-                hashlib.sha256
-            ).digest()
-            
-            calculated_hash = hmac.new(
-                secret_key,
-                data_check_string.encode(),
-                hashlib.sha256
-            ).hexdigest()
-            
-            # Сравниваем hash
-            if calculated_hash != received_hash:
-                logger.warning("Invalid hash", 
-                             received=received_hash[:10],
-                             calculated=calculated_hash[:10])
+            data_check_string = '\n'.join(
+                f"{key}={fields[key]}" for key in sorted(fields)
+            ).encode()
+            
+            # Сравниваем hash за постоянное время с каждым из ботов
+            if not any(
+                hmac.compare_digest(
+                    hmac.new(secret, data_check_string, hashlib.sha256).hexdigest(),
+                    received_hash
+                )
+                for secret in self.webapp_secrets
+            ):
+                logger.warning("Invalid hash", received=received_hash[:10])
                 return None
             
             # Проверяем время (данные действительны 24 часа)
-            auth_date = int(parsed_data.get('auth_date', [0])[0])
-            if auth_date and (time.time() - auth_date) > 86400:
+            auth_date = int(fields.get('auth_date', 0))
+            age = time.time() - auth_date
+            if auth_date and age > INIT_DATA_TTL_SECONDS:
                 logger.warning("Init data expired")
                 return None
             
             # Парсим user данные
-            user_data = parsed_data.get('user', [None])[0]
-            if user_data:
-                user = json.loads(user_data)
-            else:
-                user = None
-            
-            # Возвращаем валидированные данные
-            return {
+            user_data = fields.get('user')
+            user = json.loads(user_data) if user_data else None
+            
+            validated = {
                 'user': user,
                 'auth_date': auth_date,
-                'query_id': parsed_data.get('query_id', [None])[0],
-                'chat_instance': parsed_data.get('chat_instance', [None])[0],
-                'chat_type': parsed_data.get('chat_type', [None])[0],
-                'start_param': parsed_data.get('start_param', [None])[0],
+                'query_id': fields.get('query_id'),
+                'chat_instance': fields.get('chat_instance'),
+                'chat_type': fields.get('chat_type'),
+                'start_param': fields.get('start_param'),
             }
             
+            # Повторные запросы с теми же initData (возврат в приложение) не пересчитываются
+            if auth_date:
+                self._validated.set(cache_key, validated, ttl=INIT_DATA_TTL_SECONDS - age)
+            
+            return validated
+            
         except Exception as e:
             logger.error(f"Error validating init data: {e}")
             return None
@@ -175,7 +187,7 @@ class TelegramAuthService:
                 hashlib.sha256
             ).hexdigest()
             
-            if signature != expected_signature:
+            if not hmac.compare_digest(signature, expected_signature):
                 return None
             
             # Проверяем время (токен действителен 7 дней)
@@ -219,6 +231,12 @@ class TelegramAuthService:
         return f"https://t.me/{bot_username}/app"
 
 
+@lru_cache(maxsize=8)
+def _cached_auth_service(bot_token: str, extra_bot_tokens: Tuple[str, ...]) -> TelegramAuthService:
+    return TelegramAuthService(bot_token, extra_bot_tokens)
+
+
 # Экспорт для использования
-def get_telegram_auth_service(bot_token: str) -> TelegramAuthService:
-    return TelegramAuthService(bot_token)
\ No newline at end of file
+def get_telegram_auth_service(bot_token: str, extra_bot_tokens: Sequence[str] = ()) -> TelegramAuthService:
+    """Сервис создается один раз на набор токенов, чтобы ключи и кэш переиспользовались"""
+    return _cached_auth_service(bot_token, tuple(extra_bot_tokens))
\ No newline at end of file
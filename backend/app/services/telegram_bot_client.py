@@ -0,0 +1,107 @@
+"""
+Асинхронный клиент Telegram Bot API
+"""
+
+from typing import Any, Dict, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+
+class TelegramAPIError(Exception):
+    """Ответ Bot API с ok=false"""
+
+    def __init__(self, error_code: int, description: str, retry_after: Optional[float] = None):
+        super().__init__(f"{error_code}: {description}")
+        self.error_code = error_code
+        self.description = description
+        self.retry_after = retry_after
+
+
+class TelegramBotClient:
+    def __init__(
+        self,
+        bot_token: str,
+        api_url: str = TELEGRAM_API_URL,
+        timeout: float = 10.0,
+        max_connections: int = 20
+    ):
+        """
+        Клиент Bot API поверх одного httpx.AsyncClient
+
+        Соединения с api.telegram.org переиспользуются (keep-alive), поэтому
+        TCP и TLS рукопожатие происходит один раз, а не на каждое сообщение.
+
+        Args:
+            bot_token: Токен бота из BotFather
+            api_url: Базовый URL Bot API (можно указать локальный сервер)
+            timeout: Таймаут одного запроса в секундах
+            max_connections: Размер пула соединений
+        """
+        self.base_url = f"{api_url.rstrip('/')}/bot{bot_token}"
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def call(
+        self,
+        method: str,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Вызвать метод Bot API и вернуть поле result (timeout - для long polling)"""
+        response = await self._client.post(
+            f"{self.base_url}/{method}",
+            json=payload or {},
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        return self._result(response)
+
+    async def call_raw(self, method: str, body: bytes) -> Any:
+        """Вызвать метод с уже сериализованным JSON-телом"""
+        response = await self._client.post(
+            f"{self.base_url}/{method}", content=body, headers={"Content-Type": "application/json"}
+        )
+        return self._result(response)
+
+    @staticmethod
+    def _result(response: httpx.Response) -> Any:
+        try:
+            data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+
+        if not data.get("ok"):
+            parameters = data.get("parameters") or {}
+            raise TelegramAPIError(
+                data.get("error_code", response.status_code),
+                data.get("description", ""),
+                parameters.get("retry_after"),
+            )
+        return data.get("result")
+
+    async def send_message(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: Optional[Dict] = None,
+        parse_mode: str = "HTML"
+    ) -> Any:
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+        if reply_markup:
+            payload["reply_markup"] = reply_markup
+        return await self.call("sendMessage", payload)
+
+    async def send_prepared(self, body: bytes) -> Any:
+        """sendMessage с готовым телом (см. PreparedMessage)"""
+        return await self.call_raw("sendMessage", body)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
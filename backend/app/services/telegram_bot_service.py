@@ -0,0 +1,138 @@
+"""
+Данные для команд бота: статистика и генерация тренировок
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_read_session
+from app.models.user import User
+from app.models.workout_history import WorkoutHistory
+from app.services.ai_service import UserProfile, ai_service
+
+T = TypeVar("T")
+
+# Значения по умолчанию для профиля, если пользователь их не заполнил
+DEFAULT_PROFILE = {"age": 25, "weight": 70.0, "height": 175.0, "fitness_level": "beginner"}
+
+
+class StatCard:
+    """Агрегаты пользователя и уже отрендеренные по ним сообщения"""
+
+    __slots__ = ("stamp", "values", "rendered")
+
+    def __init__(self, stamp: Tuple, values: Dict[str, Any]):
+        self.stamp = stamp
+        self.values = values
+        self.rendered: Dict[str, Any] = {}
+
+
+# telegram_id -> StatCard; TTL нужен, т.к. окна "за неделю/месяц" сдвигаются сами
+_stat_cards = TTLCache(maxsize=settings.BOT_STATS_CACHE_MAX_SIZE, ttl=settings.BOT_STATS_CACHE_TTL_SECONDS)
+
+
+def invalidate_stat_card(telegram_id: int) -> None:
+    """Сбросить карточку после завершения тренировки"""
+    _stat_cards.pop(telegram_id)
+
+
+def _read_stamp(db: Session, telegram_id: int) -> Optional[Tuple]:
+    """Дешевый поиск по индексу: меняется при любом обновлении пользователя, в т.ч. из другого процесса"""
+    row = db.query(User.id, User.total_workouts, User.updated_at).filter(User.telegram_id == telegram_id).first()
+    return tuple(row) if row else None
+
+
+def load_user_stats(db: Session, user_id: int) -> Dict[str, Any]:
+    """Профиль и агрегаты по завершенным тренировкам одним запросом к истории"""
+    user = db.query(
+        User.first_name, User.last_name, User.level, User.total_workouts, User.streak_days, User.total_minutes
+    ).filter(User.id == user_id).one()
+
+    now = datetime.utcnow()
+    week, month, year, exercises = db.query(
+        func.sum(case((WorkoutHistory.completed_at >= now - timedelta(days=7), 1), else_=0)),
+        func.sum(case((WorkoutHistory.completed_at >= now - timedelta(days=30), 1), else_=0)),
+        func.sum(case((WorkoutHistory.completed_at >= now - timedelta(days=365), 1), else_=0)),
+        func.sum(WorkoutHistory.completed_exercises)
+    ).filter(
+        WorkoutHistory.user_id == user_id,
+        WorkoutHistory.completed_at.isnot(None)
+    ).one()
+
+    return {
+        "first_name": user.first_name or "",
+        "last_name": user.last_name or "",
+        "level": user.level or 1,
+        "total_workouts": user.total_workouts or 0,
+        "streak_days": user.streak_days or 0,
+        "total_minutes": user.total_minutes or 0,
+        "total_exercises": exercises or 0,
+        "week_workouts": week or 0,
+        "month_workouts": month or 0,
+        "year_workouts": year or 0,
+    }
+
+
+def _load_stat_card(telegram_id: int) -> Optional[StatCard]:
+    db = get_read_session()
+    try:
+        stamp = _read_stamp(db, telegram_id)
+        if stamp is None:
+            _stat_cards.pop(telegram_id)
+            return None
+
+        card = _stat_cards.get(telegram_id)
+        if card is None or card.stamp != stamp:
+            card = StatCard(stamp, load_user_stats(db, stamp[0]))
+            _stat_cards.set(telegram_id, card)
+        return card
+    finally:
+        db.close()
+
+
+async def get_stat_card(telegram_id: int, key: str, render: Callable[[Dict[str, Any]], T]) -> Optional[T]:
+    """
+    Отрендеренная карточка статистики (None, если пользователь не зарегистрирован)
+
+    Агрегаты и результат render кэшируются по пользователю и пересчитываются,
+    только когда меняется его запись (завершение тренировки, профиль).
+    """
+    card = await asyncio.to_thread(_load_stat_card, telegram_id)
+    if card is None:
+        return None
+    rendered = card.rendered.get(key)
+    if rendered is None:
+        rendered = card.rendered[key] = render(card.values)
+    return rendered
+
+
+def _load_profile(telegram_id: int) -> Dict[str, Any]:
+    db = get_read_session()
+    try:
+        user = db.query(
+            User.age, User.weight, User.height, User.experience_level, User.goals, User.fitness_goal
+        ).filter(User.telegram_id == telegram_id).first()
+    finally:
+        db.close()
+
+    if not user:
+        return {**DEFAULT_PROFILE, "goals": ["general_fitness"]}
+    return {
+        "age": user.age or DEFAULT_PROFILE["age"],
+        "weight": user.weight or DEFAULT_PROFILE["weight"],
+        "height": user.height or DEFAULT_PROFILE["height"],
+        "fitness_level": user.experience_level or DEFAULT_PROFILE["fitness_level"],
+        "goals": user.goals or ([user.fitness_goal] if user.fitness_goal else ["general_fitness"]),
+    }
+
+
+async def generate_workout(telegram_id: int):
+    """Тренировка от GeminiAIService по профилю пользователя; блокирующие вызовы - в пуле потоков"""
+    profile = UserProfile(**await asyncio.to_thread(_load_profile, telegram_id))
+    return await asyncio.to_thread(ai_service.generate_workout, profile)
@@ -0,0 +1,166 @@
+"""
+Маршрутизация команд бота и заранее сериализованные шаблоны сообщений
+"""
+
+import html
+import json
+from string import Formatter
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _tail(fields: Dict[str, Any]) -> bytes:
+    """Поля объекта без открывающей скобки: ',"a":1,"b":2}'"""
+    return b"," + _dumps(fields)[1:]
+
+
+def _head(chat_id: int) -> bytes:
+    return b'{"chat_id":' + str(int(chat_id)).encode()
+
+
+class Html(str):
+    """Уже экранированный HTML-фрагмент: подставляется в шаблон как есть"""
+
+
+class TextTemplate:
+    def __init__(self, text: str):
+        """
+        Шаблон текста с полями {name} или {name:spec}
+
+        Текст разбирается один раз; строковые значения экранируются для
+        parse_mode=HTML, кроме значений типа Html.
+        """
+        self.text = text
+        self._parts: List[Tuple[str, Optional[str], str]] = [
+            (literal, field, spec or "") for literal, field, spec, _ in Formatter().parse(text)
+        ]
+
+    def render(self, **values: Any) -> str:
+        chunks = []
+        for literal, field, spec in self._parts:
+            chunks.append(literal)
+            if field is not None:
+                value = values[field]
+                if isinstance(value, str) and not isinstance(value, Html):
+                    value = html.escape(value, quote=False)
+                chunks.append(format(value, spec))
+        return "".join(chunks)
+
+
+class PreparedMessage:
+    def __init__(self, text: str, reply_markup: Optional[Dict] = None, parse_mode: str = "HTML"):
+        """
+        Статическое сообщение, сериализованное в тело sendMessage при старте
+
+        При отправке к готовым байтам только приклеивается chat_id.
+        """
+        fields = {"text": text, "parse_mode": parse_mode}
+        if reply_markup:
+            fields["reply_markup"] = reply_markup
+        self._tail = _tail(fields)
+
+    def payload(self, chat_id: int) -> bytes:
+        return _head(chat_id) + self._tail
+
+
+class MessageTemplate:
+    def __init__(self, text: str, reply_markup: Optional[Dict] = None, parse_mode: str = "HTML"):
+        """
+        Динамическое сообщение: текст из TextTemplate, клавиатура сериализована один раз
+        """
+        self.text = TextTemplate(text)
+        self.reply_markup = reply_markup
+        self.parse_mode = parse_mode
+        fields = {"parse_mode": parse_mode}
+        if reply_markup:
+            fields["reply_markup"] = reply_markup
+        self._tail = _tail(fields)
+
+    def payload(self, chat_id: int, **values: Any) -> bytes:
+        return _head(chat_id) + b',"text":' + _dumps(self.text.render(**values)) + self._tail
+
+    def prepare(self, **values: Any) -> PreparedMessage:
+        """Отрендерить один раз, чтобы затем отправлять как статическое (например, из кэша)"""
+        return PreparedMessage(self.text.render(**values), self.reply_markup, self.parse_mode)
+
+
+class CommandContext(NamedTuple):
+    chat_id: int
+    user: Dict[str, Any]
+    args: str
+    update: Dict[str, Any]
+
+
+CommandHandler = Callable[[CommandContext], Awaitable[None]]
+
+
+class CommandRouter:
+    def __init__(self, bot_username: Optional[str] = None):
+        """
+        Таблица команд (/start) и callback_data (кнопки) вместо цепочки if/elif
+
+        callback_data вида "name:args" маршрутизируется по name.
+
+        Args:
+            bot_username: Имя бота; команды вида /start@other_bot в группах игнорируются
+        """
+        self.bot_username = bot_username.lower() if bot_username else None
+        self._commands: Dict[str, CommandHandler] = {}
+        self._callbacks: Dict[str, CommandHandler] = {}
+
+    def command(self, *names: str):
+        def register(handler: CommandHandler) -> CommandHandler:
+            for name in names:
+                self._commands[name.lstrip("/").lower()] = handler
+            return handler
+        return register
+
+    def callback(self, *names: str):
+        def register(handler: CommandHandler) -> CommandHandler:
+            for name in names:
+                self._callbacks[name] = handler
+            return handler
+        return register
+
+    def parse_command(self, text: str) -> Optional[Tuple[str, str]]:
+        """'/start@bot payload' -> ('start', 'payload')"""
+        if not text.startswith("/"):
+            return None
+        command, _, args = text[1:].partition(" ")
+        name, _, mention = command.partition("@")
+        if mention and self.bot_username and mention.lower() != self.bot_username:
+            return None
+        return name.lower(), args.strip()
+
+    async def dispatch(self, update: Dict[str, Any]) -> bool:
+        """Вызвать обработчик обновления; False, если подходящего нет"""
+        message = update.get("message")
+        if message:
+            parsed = self.parse_command(message.get("text") or "")
+            handler = self._commands.get(parsed[0]) if parsed else None
+            if handler is None:
+                if parsed:
+                    logger.info("Unknown bot command", command=parsed[0], chat=message["chat"]["id"])
+                return False
+            await handler(CommandContext(message["chat"]["id"], message.get("from") or {}, parsed[1], update))
+            return True
+
+        callback_query = update.get("callback_query")
+        if callback_query:
+            name, _, args = (callback_query.get("data") or "").partition(":")
+            handler = self._callbacks.get(name)
+            if handler is None:
+                logger.warning("Unknown callback query", callback=name, user=callback_query["from"]["id"])
+                return False
+            chat = (callback_query.get("message") or {}).get("chat") or callback_query["from"]
+            await handler(CommandContext(chat["id"], callback_query["from"], args, update))
+            return True
+
+        return False
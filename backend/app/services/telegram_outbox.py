@@ -0,0 +1,327 @@
+"""
+Очередь исходящих сообщений бота с учетом лимитов Telegram
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+import httpx
+import structlog
+
+from app.core.metrics import create_counter
+from app.core.rate_limit import TokenBucket
+from app.services.telegram_bot_client import TelegramAPIError, TelegramBotClient
+
+logger = structlog.get_logger()
+
+# Полосы приоритета: ответы пользователю всегда раньше рассылок
+INTERACTIVE = 0
+BROADCAST = 1
+LANE_NAMES = ("interactive", "broadcast")
+
+# Лимиты Bot API: ~30 сообщений в секунду всего и ~1 в секунду в один чат
+GLOBAL_MESSAGES_PER_SECOND = 30.0
+CHAT_MESSAGES_PER_SECOND = 1.0
+CHAT_BURST = 3
+
+# Сколько сообщений полосы просматривать в поиске чата, которому можно отправить
+SCAN_WINDOW = 200
+MAX_CHAT_BUCKETS = 100000
+
+TELEGRAM_MESSAGES = create_counter(
+    'telegram_outbox_messages_total',
+    'Outbound Telegram messages by lane and result',
+    ['lane', 'result']
+)
+
+
+class OutboxMessage:
+    __slots__ = ("chat_id", "text", "reply_markup", "priority", "row_id", "attempts", "not_before", "body")
+
+    def __init__(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: Optional[Dict] = None,
+        priority: int = INTERACTIVE,
+        row_id: Optional[int] = None,
+        attempts: int = 0
+    ):
+        self.chat_id = chat_id
+        self.text = text
+        self.reply_markup = reply_markup
+        self.priority = priority
+        self.row_id = row_id
+        self.attempts = attempts
+        self.not_before = 0.0
+        # Готовое тело sendMessage (шаблоны); тогда text и reply_markup не используются
+        self.body: Optional[bytes] = None
+
+
+class OutboxStore:
+    """Локальная SQLite-очередь: рассылки переживают перезапуск процесса"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "chat_id INTEGER NOT NULL, "
+                "text TEXT NOT NULL, "
+                "reply_markup TEXT, "
+                "priority INTEGER NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL)"
+            )
+
+    def add_many(self, messages: List[OutboxMessage]) -> None:
+        """Сохранить сообщения одной транзакцией и проставить row_id"""
+        now = time.time()
+        with self._lock, self._conn:
+            for message in messages:
+                cursor = self._conn.execute(
+                    "INSERT INTO outbox (chat_id, text, reply_markup, priority, attempts, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        message.chat_id, message.text,
+                        json.dumps(message.reply_markup) if message.reply_markup else None,
+                        message.priority, message.attempts, now,
+                    )
+                )
+                message.row_id = cursor.lastrowid
+
+    def delete(self, row_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+
+    def load(self) -> List[OutboxMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, chat_id, text, reply_markup, priority, attempts FROM outbox ORDER BY id"
+            ).fetchall()
+        return [
+            OutboxMessage(chat_id, text, json.loads(markup) if markup else None, priority, row_id, attempts)
+            for row_id, chat_id, text, markup, priority, attempts in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxScheduler:
+    def __init__(
+        self,
+        client: TelegramBotClient,
+        store: Optional[OutboxStore] = None,
+        global_rate: float = GLOBAL_MESSAGES_PER_SECOND,
+        chat_rate: float = CHAT_MESSAGES_PER_SECOND,
+        chat_burst: int = CHAT_BURST,
+        max_concurrency: int = 8,
+        max_attempts: int = 5
+    ):
+        """
+        Планировщик отправки сообщений
+
+        Один диспетчер выбирает следующее сообщение: сначала из полосы
+        ответов, потом из рассылок, пропуская чаты, исчерпавшие свой
+        лимит (порядок сообщений внутри чата сохраняется). Общий лимит
+        бота и лимиты чатов - token bucket. На 429 отправка
+        приостанавливается на retry_after из ответа.
+
+        Args:
+            client: Клиент Bot API
+            store: Хранилище для рассылок; без него рассылки живут только в памяти
+            global_rate: Сообщений в секунду на весь бот
+            chat_rate: Сообщений в секунду в один чат
+            chat_burst: Сколько сообщений подряд можно отправить в чат
+            max_concurrency: Одновременных запросов к Bot API
+            max_attempts: Попыток при сетевых ошибках и 5xx
+        """
+        self.client = client
+        self.store = store
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._lanes: List[Deque[OutboxMessage]] = [deque(), deque()]
+        self._inflight_chats: Set[int] = set()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._paused_until = 0.0
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._deliveries: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes) + len(self._deliveries)
+
+    async def start(self) -> None:
+        """Поднять незавершенные рассылки из хранилища и запустить диспетчер"""
+        if self.store:
+            restored = await asyncio.to_thread(self.store.load)
+            self._lanes[BROADCAST].extend(restored)
+            if restored:
+                logger.info("Restored queued Telegram messages", count=len(restored))
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Дождаться ответов пользователям (не дольше timeout); рассылки остаются в хранилище"""
+        deadline = time.monotonic() + timeout
+        while (self._lanes[INTERACTIVE] or self._deliveries) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        if self._deliveries:
+            await asyncio.wait(self._deliveries, timeout=max(0.0, deadline - time.monotonic()))
+            for task in list(self._deliveries):
+                task.cancel()
+        if self._lanes[INTERACTIVE]:
+            logger.warning("Telegram replies dropped on shutdown", count=len(self._lanes[INTERACTIVE]))
+        if self.store:
+            self.store.close()
+
+    def send(self, chat_id: int, text: str, reply_markup: Optional[Dict] = None) -> None:
+        """Ответ пользователю: без ожидания, в приоритетную полосу, только в памяти"""
+        self._lanes[INTERACTIVE].append(OutboxMessage(chat_id, text, reply_markup, INTERACTIVE))
+        self._wakeup.set()
+
+    def send_prepared(self, chat_id: int, body: bytes) -> None:
+        """Ответ пользователю с заранее сериализованным телом sendMessage"""
+        message = OutboxMessage(chat_id, "", priority=INTERACTIVE)
+        message.body = body
+        self._lanes[INTERACTIVE].append(message)
+        self._wakeup.set()
+
+    async def broadcast(self, chat_ids: Iterable[int], text: str, reply_markup: Optional[Dict] = None) -> int:
+        """Рассылка: сообщения сохраняются до отправки и уходят после ответов пользователям"""
+        messages = [OutboxMessage(chat_id, text, reply_markup, BROADCAST) for chat_id in chat_ids]
+        if self.store:
+            await asyncio.to_thread(self.store.add_many, messages)
+        self._lanes[BROADCAST].extend(messages)
+        self._wakeup.set()
+        return len(messages)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_CHAT_BUCKETS:
+                # Полный bucket ничем не отличается от нового
+                for key in [key for key, b in self._chat_buckets.items() if b.is_full]:
+                    del self._chat_buckets[key]
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_burst, self.chat_rate)
+        return bucket
+
+    def _pick(self, now: float):
+        """Следующее сообщение, которое можно отправить сейчас, или через сколько секунд проверить снова"""
+        retry_in = None
+        for lane in self._lanes:
+            blocked: Set[int] = set()
+            for index, message in enumerate(lane):
+                if index >= SCAN_WINDOW:
+                    break
+                chat_id = message.chat_id
+                if chat_id in blocked or chat_id in self._inflight_chats:
+                    blocked.add(chat_id)
+                    continue
+                wait = message.not_before - now
+                if wait <= 0:
+                    wait = self._chat_bucket(chat_id).take(now=now)
+                    if wait == 0:
+                        del lane[index]
+                        return message, None
+                blocked.add(chat_id)
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+        return None, retry_in
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._slots.acquire()
+            self._wakeup.clear()
+            now = time.monotonic()
+
+            if now < self._paused_until:
+                self._slots.release()
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._global.refill(now)
+            if self._global.tokens < 1:
+                self._slots.release()
+                await asyncio.sleep((1 - self._global.tokens) / self._global.rate)
+                continue
+
+            message, retry_in = self._pick(now)
+            if message is None:
+                self._slots.release()
+                await self._wait(retry_in)
+                continue
+
+            self._global.tokens -= 1
+            self._inflight_chats.add(message.chat_id)
+            task = asyncio.create_task(self._deliver(message))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, message: OutboxMessage) -> None:
+        lane = LANE_NAMES[message.priority]
+        result = "sent"
+        try:
+            if message.body is not None:
+                await self.client.send_prepared(message.body)
+            else:
+                await self.client.send_message(message.chat_id, message.text, message.reply_markup)
+        except TelegramAPIError as e:
+            if e.retry_after:
+                # Флуд-контроль: пауза для всего бота, сообщение уходит первым после нее
+                self._paused_until = max(self._paused_until, time.monotonic() + float(e.retry_after))
+                logger.warning("Telegram flood limit hit", retry_after=e.retry_after)
+                self._lanes[message.priority].appendleft(message)
+                result = "throttled"
+            elif e.error_code >= 500:
+                result = self._retry(message, e)
+            else:
+                # 400/403: чат не найден, бот заблокирован - повтор не поможет
+                logger.info(f"Telegram message rejected: {e}", chat_id=message.chat_id)
+                result = "rejected"
+        except httpx.HTTPError as e:
+            result = self._retry(message, e)
+        except Exception as e:
+            logger.error(f"Ошибка отправки сообщения: {e}", chat_id=message.chat_id)
+            result = "failed"
+        finally:
+            self._inflight_chats.discard(message.chat_id)
+            self._slots.release()
+            self._wakeup.set()
+
+        TELEGRAM_MESSAGES.labels(lane=lane, result=result).inc()
+        if result in ("sent", "rejected", "failed") and message.row_id is not None:
+            await asyncio.to_thread(self.store.delete, message.row_id)
+
+    def _retry(self, message: OutboxMessage, error: Exception) -> str:
+        message.attempts += 1
+        if message.attempts >= self.max_attempts:
+            logger.error(f"Ошибка отправки сообщения: {error}", chat_id=message.chat_id, attempts=message.attempts)
+            return "failed"
+        # Экспоненциальная задержка только для этого чата
+        message.not_before = time.monotonic() + min(2 ** message.attempts, 60)
+        self._lanes[message.priority].appendleft(message)
+        return "retried"
@@ -0,0 +1,187 @@
+"""
+Получение обновлений бота через long polling (без публичного URL для webhook)
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import httpx
+import structlog
+
+from app.services.telegram_bot_client import TelegramAPIError, TelegramBotClient
+from app.services.telegram_updates import UpdateDispatcher
+
+logger = structlog.get_logger()
+
+DEFAULT_ALLOWED_UPDATES = ("message", "edited_message", "callback_query")
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class LongPollingRunner:
+    def __init__(
+        self,
+        client: TelegramBotClient,
+        dispatcher: UpdateDispatcher,
+        offset_path: Optional[str] = "telegram_offset.txt",
+        poll_timeout: int = 30,
+        batch_size: int = 100,
+        allowed_updates: Sequence[str] = DEFAULT_ALLOWED_UPDATES
+    ):
+        """
+        Цикл getUpdates
+
+        Обновления забираются пачками (до batch_size за запрос, запрос
+        висит до poll_timeout секунд, пока обновлений нет) и передаются
+        тому же UpdateDispatcher, что и webhook: чаты обрабатываются
+        параллельно, повторы отбрасываются. В файл сохраняется смещение
+        до первого еще не обработанного обновления и update_id уже
+        обработанных обновлений выше него: после падения Telegram пришлет
+        их снова, незавершенные обрабатываются, а готовые пропускаются.
+
+        Args:
+            client: Клиент Bot API
+            dispatcher: Диспетчер обновлений
+            offset_path: Файл со смещением (None - не сохранять)
+            poll_timeout: Таймаут long polling в секундах
+            batch_size: Максимум обновлений за один запрос (1-100)
+            allowed_updates: Типы обновлений, которые нужны боту
+        """
+        self.client = client
+        self.dispatcher = dispatcher
+        self.offset_path = offset_path
+        self.poll_timeout = poll_timeout
+        self.batch_size = batch_size
+        self.allowed_updates = list(allowed_updates)
+        # Смещение для getUpdates: все, что уже получено
+        self.offset, self._done = self._load_offset()
+        # Полученные, но еще не обработанные update_id
+        self._in_flight: Set[int] = set()
+        # _done: обработанные update_id не ниже сохраняемого смещения
+        self._saved: Tuple[int, Tuple[int, ...]] = (self.offset, tuple(sorted(self._done)))
+        self._offset_changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._saver: Optional[asyncio.Task] = None
+
+    def _load_offset(self) -> Tuple[int, Set[int]]:
+        """Смещение (первая строка) и обработанные update_id выше него (вторая)"""
+        if not self.offset_path or not os.path.exists(self.offset_path):
+            return 0, set()
+        try:
+            with open(self.offset_path, "r", encoding="utf-8") as f:
+                offset_line, _, done_line = f.read().strip().partition("\n")
+            done = {int(update_id) for update_id in done_line.split(",") if update_id.strip()}
+            return int(offset_line or 0), done
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать смещение: {e}")
+            return 0, set()
+
+    def _save_offset(self, offset: int, done: Tuple[int, ...]) -> None:
+        """Блокирующая запись файла; вызывается через asyncio.to_thread"""
+        tmp_path = f"{self.offset_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{offset}\n{','.join(map(str, done))}")
+        # Атомарная замена: после падения файл всегда целый
+        os.replace(tmp_path, self.offset_path)
+
+    @property
+    def processed_offset(self) -> int:
+        """Смещение, до которого все обновления обработаны"""
+        return min(self._in_flight, default=self.offset)
+
+    def _on_processed(self, update: Dict[str, Any]) -> None:
+        self._in_flight.discard(update["update_id"])
+        self._done.add(update["update_id"])
+        self._offset_changed.set()
+
+    async def _persist(self) -> None:
+        offset = self.processed_offset
+        self._done = {update_id for update_id in self._done if update_id >= offset}
+        state = (offset, tuple(sorted(self._done)))
+        if not self.offset_path or state == self._saved:
+            return
+        try:
+            await asyncio.to_thread(self._save_offset, *state)
+            self._saved = state
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить смещение: {e}")
+
+    async def _save_loop(self) -> None:
+        # Одна задача пишет файл, поэтому записи не идут параллельно
+        while True:
+            await self._offset_changed.wait()
+            self._offset_changed.clear()
+            await self._persist()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        self._saver = asyncio.create_task(self._save_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Даем принятым обновлениям завершиться, чтобы сохранить их смещение
+        await self.dispatcher.stop()
+        if self._saver:
+            self._saver.cancel()
+            await asyncio.gather(self._saver, return_exceptions=True)
+            self._saver = None
+        await self._persist()
+
+    async def _fetch(self) -> List[dict]:
+        return await self.client.call(
+            "getUpdates",
+            {
+                "offset": self.offset,
+                "limit": self.batch_size,
+                "timeout": self.poll_timeout,
+                "allowed_updates": self.allowed_updates,
+            },
+            timeout=self.poll_timeout + 10
+        )
+
+    async def _run(self) -> None:
+        logger.info("Telegram long polling started", offset=self.offset)
+
+        webhook_deleted = False
+        backoff = 1.0
+        while True:
+            try:
+                if not webhook_deleted:
+                    # getUpdates не работает, пока у бота установлен webhook
+                    await self.client.call("deleteWebhook", {"drop_pending_updates": False})
+                    webhook_deleted = True
+                updates = await self._fetch()
+                backoff = 1.0
+            except TelegramAPIError as e:
+                if e.retry_after:
+                    await asyncio.sleep(float(e.retry_after))
+                    continue
+                # 409: параллельно работает другой экземпляр или снова выставлен webhook
+                logger.error(f"Ошибка getUpdates: {e}")
+                if e.error_code == 409:
+                    webhook_deleted = False
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                continue
+            except httpx.HTTPError as e:
+                logger.warning(f"Ошибка соединения с Bot API: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                continue
+
+            if not updates:
+                continue
+
+            for update in updates:
+                if update["update_id"] in self._done:
+                    # Обработано до перезапуска, Telegram прислал повторно
+                    continue
+                self._in_flight.add(update["update_id"])
+                if not self.dispatcher.submit(update, on_done=self._on_processed):
+                    # Повтор или переполненная очередь чата: обработки не будет
+                    self._on_processed(update)
+            self.offset = max(update["update_id"] for update in updates) + 1
+            self._offset_changed.set()
@@ -0,0 +1,121 @@
+"""
+Прием обновлений бота: дедупликация и последовательная обработка по чатам
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+import structlog
+
+from app.core.cache import TTLCache
+from app.core.metrics import create_counter
+
+logger = structlog.get_logger()
+
+TELEGRAM_UPDATES = create_counter(
+    'telegram_updates_total',
+    'Incoming Telegram updates by outcome',
+    ['result']
+)
+
+UpdateHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+DoneCallback = Callable[[Dict[str, Any]], None]
+
+
+def update_chat_key(update: Dict[str, Any]) -> Hashable:
+    """Чат, к которому относится обновление; обновления без чата обрабатываются независимо"""
+    for field in ("message", "edited_message", "channel_post", "edited_channel_post"):
+        message = update.get(field)
+        if message and message.get("chat"):
+            return message["chat"]["id"]
+
+    callback_query = update.get("callback_query")
+    if callback_query:
+        message = callback_query.get("message") or {}
+        if message.get("chat"):
+            return message["chat"]["id"]
+        return callback_query["from"]["id"]
+
+    return ("update", update.get("update_id"))
+
+
+class UpdateDispatcher:
+    def __init__(self, handler: UpdateHandler, dedup_window: int = 10000, max_pending_per_chat: int = 100):
+        """
+        Диспетчер обновлений Telegram
+
+        Telegram повторяет доставку, если webhook ответил медленно, поэтому
+        последние dedup_window значений update_id запоминаются и повторы
+        отбрасываются. Обновления одного чата обрабатываются строго по
+        порядку, разные чаты - параллельно; submit() не ждет обработчика.
+
+        Args:
+            handler: Корутина, обрабатывающая одно обновление
+            dedup_window: Сколько последних update_id помнить
+            max_pending_per_chat: Лимит очереди одного чата (защита от флуда)
+        """
+        self.handler = handler
+        self.max_pending_per_chat = max_pending_per_chat
+        self._seen = TTLCache(maxsize=dedup_window)
+        self._queues: Dict[Hashable, Deque[Tuple[Dict[str, Any], Optional[DoneCallback]]]] = {}
+        self._workers: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values()) + len(self._workers)
+
+    def submit(self, update: Dict[str, Any], on_done: Optional[DoneCallback] = None) -> bool:
+        """
+        Поставить обновление в очередь его чата; False для повтора или переполнения
+
+        on_done(update) вызывается, когда обработчик завершился (в том числе
+        с ошибкой); для отклоненных обновлений и при отмене не вызывается.
+        """
+        update_id: Optional[int] = update.get("update_id")
+        if update_id is not None:
+            if update_id in self._seen:
+                TELEGRAM_UPDATES.labels(result="duplicate").inc()
+                return False
+            self._seen.set(update_id, True)
+
+        key = update_chat_key(update)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            worker = asyncio.create_task(self._drain(key, queue))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        elif len(queue) >= self.max_pending_per_chat:
+            logger.warning("Telegram chat queue full, update dropped", chat=key, update_id=update_id)
+            TELEGRAM_UPDATES.labels(result="dropped").inc()
+            return False
+
+        queue.append((update, on_done))
+        TELEGRAM_UPDATES.labels(result="accepted").inc()
+        return True
+
+    async def _drain(self, key: Hashable, queue: Deque[Tuple[Dict[str, Any], Optional[DoneCallback]]]) -> None:
+        # Задача живет, пока у чата есть обновления; между проверкой пустой
+        # очереди и удалением ключа нет await, поэтому submit() не потеряет обновление
+        try:
+            while queue:
+                update, on_done = queue.popleft()
+                try:
+                    await self.handler(update)
+                except Exception as e:
+                    logger.error(f"Ошибка обработки обновления: {e}", update_id=update.get("update_id"))
+                if on_done is not None:
+                    on_done(update)
+        finally:
+            self._queues.pop(key, None)
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Дождаться обработки принятых обновлений (не дольше timeout)"""
+        if not self._workers:
+            return
+        done, pending = await asyncio.wait(set(self._workers), timeout=timeout)
+        for worker in pending:
+            worker.cancel()
+        if pending:
+            logger.warning("Telegram updates not processed on shutdown", chats=len(pending))
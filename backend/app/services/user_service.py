@@ -2,9 +2,58 @@
 User service for MVP
 """
 
-from sqlalchemy.orm import Session
+import copy
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.user import User, UserCreate, UserUpdate
 from datetime import datetime
+from typing import Optional
+
+# telegram_id -> column values of a recently loaded User row
+_user_rows = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# telegram_id -> users.id; the mapping never changes once a user exists
+_user_ids = TTLCache(maxsize=settings.USER_ID_CACHE_MAX_SIZE)
+
+
+def cache_user(user: User) -> None:
+    """Remember user row so the next request can skip the SELECT"""
+    row = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    _user_rows.set(user.telegram_id, row)
+    _user_ids.set(user.telegram_id, user.id)
+
+
+def invalidate_user(telegram_id: int) -> None:
+    """Drop cached user row after profile or stats changes"""
+    _user_rows.pop(telegram_id)
+
+
+def get_cached_user(db: Session, telegram_id: int) -> Optional[User]:
+    """
+    Get user by Telegram ID, attaching a cached row to the session when possible
+
+    For read-only use: the cached row may be up to USER_CACHE_TTL_SECONDS old,
+    and other workers' writes do not invalidate it. Write paths must load a
+    fresh row (see auth.get_current_user_for_update).
+    """
+    row = _user_rows.get(telegram_id)
+    if row is None:
+        user = db.query(User).filter(User.telegram_id == telegram_id).first()
+        if user:
+            cache_user(user)
+        return user
+
+    key = db.identity_key(User, row["id"])
+    if key in db.identity_map:
+        return db.identity_map[key]
+
+    # JSON columns are mutable, so each session gets its own copy
+    user = User(**copy.deepcopy(row))
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
 
 
 class UserService:
@@ -31,6 +80,7 @@ class UserService:
         self.db.add(db_user)
         self.db.commit()
         self.db.refresh(db_user)
+        _user_ids.set(db_user.telegram_id, db_user.id)
         return db_user
     
     def get_user_by_telegram_id(self, telegram_id: int) -> User:
@@ -54,6 +104,7 @@ class UserService:
         
         user.updated_at = datetime.utcnow()
         self.db.commit()
+        invalidate_user(telegram_id)
         self.db.refresh(user)
         return user
     
@@ -63,6 +114,10 @@ class UserService:
         return user is not None
     
     def get_user_id_by_telegram_id(self, telegram_id: int) -> int:
-        """Get user ID by Telegram ID"""
-        user = self.get_user_by_telegram_id(telegram_id)
-        return user.id if user else None 
\ No newline at end of file
+        """Get user ID by Telegram ID (cached, loads only the id column on miss)"""
+        user_id = _user_ids.get(telegram_id)
+        if user_id is None:
+            user_id = self.db.query(User.id).filter(User.telegram_id == telegram_id).scalar()
+            if user_id is not None:
+                _user_ids.set(telegram_id, user_id)
+        return user_id 
\ No newline at end of file
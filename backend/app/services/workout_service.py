@@ -2,12 +2,23 @@
 Workout service for MVP
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.workout import Workout, WorkoutExercise, WorkoutCreate, WorkoutUpdate
 from app.services.user_service import UserService
 from app.services.exercise_service import ExerciseService
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
+
+# Loader profiles matching WorkoutResponse -> WorkoutExerciseResponse -> ExerciseResponse.
+# List: workouts + one SELECT ... IN for all their exercises (joined with exercise rows).
+WORKOUT_LIST_OPTIONS = (
+    selectinload(Workout.exercises).joinedload(WorkoutExercise.exercise),
+)
+# Detail: a single SELECT with joins.
+WORKOUT_DETAIL_OPTIONS = (
+    joinedload(Workout.exercises).joinedload(WorkoutExercise.exercise),
+)
 
 
 class WorkoutService:
@@ -26,34 +37,28 @@ class WorkoutService:
             raise ValueError("User not found")
         
         # Create workout
-        workout = Workout(
-            user_id=user_id,
-            name=workout_data.name,
-            workout_type=workout_data.workout_type,
-            duration_minutes=workout_data.duration_minutes
-        )
-        
-        self.db.add(workout)
-        self.db.commit()
-        self.db.refresh(workout)
+        workout = {
+            "user_id": user_id,
+            "name": workout_data.name,
+            "workout_type": workout_data.workout_type,
+            "duration_minutes": workout_data.duration_minutes
+        }
         
         # Add exercises
-        for i, exercise_data in enumerate(workout_data.exercises):
-            workout_exercise = WorkoutExercise(
-                workout_id=workout.id,
-                exercise_id=exercise_data.exercise_id,
-                sets=exercise_data.sets,
-                reps=exercise_data.reps,
-                weight=exercise_data.weight,
-                duration_seconds=exercise_data.duration_seconds,
-                rest_seconds=exercise_data.rest_seconds,
-                order=i
-            )
-            self.db.add(workout_exercise)
+        exercises = [
+            {
+                "exercise_id": exercise_data.exercise_id,
+                "sets": exercise_data.sets,
+                "reps": exercise_data.reps,
+                "weight": exercise_data.weight,
+                "duration_seconds": exercise_data.duration_seconds,
+                "rest_seconds": exercise_data.rest_seconds,
+                "order": i
+            }
+            for i, exercise_data in enumerate(workout_data.exercises)
+        ]
         
-        self.db.commit()
-        self.db.refresh(workout)
-        return workout
+        return self._insert_workout(workout, exercises)
     
     def get_user_workouts(self, telegram_id: int, limit: int = 10, offset: int = 0) -> List[Workout]:
         """Get user workouts"""
@@ -61,13 +66,15 @@ class WorkoutService:
         if not user_id:
             return []
         
-        return self.db.query(Workout).filter(
+        return self.db.query(Workout).options(*WORKOUT_LIST_OPTIONS).filter(
             Workout.user_id == user_id
         ).order_by(Workout.created_at.desc()).offset(offset).limit(limit).all()
     
     def get_workout(self, workout_id: int) -> Workout:
         """Get workout by ID"""
-        return self.db.query(Workout).filter(Workout.id == workout_id).first()
+        return self.db.query(Workout).options(*WORKOUT_DETAIL_OPTIONS).filter(
+            Workout.id == workout_id
+        ).first()
     
     def update_workout(self, workout_id: int, workout_data: WorkoutUpdate) -> Workout:
         """Update workout"""
@@ -81,8 +88,7 @@ class WorkoutService:
             setattr(workout, field, value)
         
         self.db.commit()
-        self.db.refresh(workout)
-        return workout
+        return self.get_workout(workout_id)
     
     def complete_workout(self, workout_id: int) -> Workout:
         """Mark workout as completed"""
@@ -94,8 +100,7 @@ class WorkoutService:
         workout.completed_at = datetime.utcnow()
         
         self.db.commit()
-        self.db.refresh(workout)
-        return workout
+        return self.get_workout(workout_id)
     
     def generate_simple_workout(
         self,
@@ -117,29 +122,44 @@ class WorkoutService:
         
         # Create workout
         workout_name = f"{workout_type.title()} Workout - {', '.join(muscle_groups).title()}"
-        workout = Workout(
-            user_id=user_id,
-            name=workout_name,
-            workout_type=workout_type,
-            duration_minutes=45
-        )
-        
-        self.db.add(workout)
-        self.db.commit()
-        self.db.refresh(workout)
+        workout = {
+            "user_id": user_id,
+            "name": workout_name,
+            "workout_type": workout_type,
+            "duration_minutes": 45
+        }
         
         # Add exercises to workout
-        for i, exercise in enumerate(exercises):
-            workout_exercise = WorkoutExercise(
-                workout_id=workout.id,
-                exercise_id=exercise.id,
-                sets=3,
-                reps=10,
-                rest_seconds=60,
-                order=i
+        workout_exercises = [
+            {
+                "exercise_id": exercise.id,
+                "sets": 3,
+                "reps": 10,
+                "rest_seconds": 60,
+                "order": i
+            }
+            for i, exercise in enumerate(exercises)
+        ]
+        
+        return self._insert_workout(workout, workout_exercises)
+    
+    def _insert_workout(self, workout: Dict[str, Any], exercises: List[Dict[str, Any]]) -> Workout:
+        """
+        Insert workout and its exercises in a single transaction.
+        
+        The workout id comes back from INSERT ... RETURNING and all
+        exercises go out as one bulk INSERT, instead of commit/refresh
+        cycles and one INSERT per exercise.
+        """
+        workout_id = self.db.execute(
+            insert(Workout).values(**workout).returning(Workout.id)
+        ).scalar_one()
+        
+        if exercises:
+            self.db.execute(
+                insert(WorkoutExercise),
+                [{"workout_id": workout_id, **exercise} for exercise in exercises]
             )
-            self.db.add(workout_exercise)
         
         self.db.commit()
-        self.db.refresh(workout)
-        return workout 
\ No newline at end of file
+        return self.get_workout(workout_id)
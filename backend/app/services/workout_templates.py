@@ -0,0 +1,130 @@
+"""
+Ready-made workout templates loaded from app/data/workout_templates.json
+"""
+
+import hashlib
+import json
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.core.responses import dumps
+
+logger = structlog.get_logger()
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).resolve().parent.parent / "data" / "workout_templates.json"
+REQUIRED_FIELDS = ("level", "id", "name", "duration", "exercises_count", "equipment")
+
+
+class PreparedBody(NamedTuple):
+    """Serialized JSON list and its ETag"""
+    body: bytes
+    etag: str
+
+
+class TemplateList(NamedTuple):
+    """
+    Templates of one level and equipment (None - any), in file order
+
+    Every template is serialized once. durations holds the distinct durations
+    sorted, so a max_duration filter maps to a cap: bisect_right(durations,
+    max_duration), or len(durations) without a filter. Durations are positive.
+    """
+    durations: Tuple[int, ...]
+    parts: Tuple[Tuple[int, bytes], ...]  # (duration, serialized template)
+
+
+class WorkoutTemplateCatalog:
+    """Templates indexed by level, equipment and duration; each body is joined once, on first use"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_TEMPLATES_PATH
+        self._levels: Dict[str, Dict[Optional[str], TemplateList]] = {}
+        self._bodies: Dict[Tuple[str, Optional[str], int], PreparedBody] = {}
+        self._version = ""
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def levels(self) -> List[str]:
+        self.ensure_loaded()
+        return list(self._levels)
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def load(self) -> None:
+        """Read the data file and rebuild the index"""
+        raw = self.path.read_bytes()
+        rows = json.loads(raw)
+        version = hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+        by_level: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            missing = [field for field in REQUIRED_FIELDS if field not in row]
+            if missing:
+                raise ValueError(f"Workout template {row.get('id')} is missing {', '.join(missing)}")
+            template = {key: value for key, value in row.items() if key != "level"}
+            by_level.setdefault(row["level"], []).append(template)
+
+        self._levels = {level: self._index(templates) for level, templates in by_level.items()}
+        self._bodies = {}
+        self._version = version
+        self._loaded = True
+        logger.info("Workout templates loaded", templates=len(rows), levels=len(self._levels), version=version)
+
+    @staticmethod
+    def _index(templates: List[Dict[str, Any]]) -> Dict[Optional[str], TemplateList]:
+        serialized = [(template, dumps(template)) for template in templates]
+
+        index = {}
+        for equipment in [None] + sorted({template["equipment"] for template in templates}):
+            parts = tuple(
+                (template["duration"], part) for template, part in serialized
+                if equipment is None or template["equipment"] == equipment
+            )
+            index[equipment] = TemplateList(tuple(sorted({duration for duration, _ in parts})), parts)
+        return index
+
+    def lookup(
+        self,
+        level: str,
+        equipment: Optional[str] = None,
+        max_duration: Optional[int] = None
+    ) -> Optional[PreparedBody]:
+        """Prepared body for the filters; None for an unknown level"""
+        self.ensure_loaded()
+        index = self._levels.get(level)
+        if index is None:
+            return None
+
+        templates = index.get(equipment)
+        if templates is None:
+            cap = 0
+        elif max_duration is None:
+            cap = len(templates.durations)
+        else:
+            cap = bisect_right(templates.durations, max_duration)
+
+        # An unknown equipment and an empty selection share one body
+        key = (level, equipment if cap else None, cap)
+        prepared = self._bodies.get(key)
+        if prepared is None:
+            limit = templates.durations[cap - 1] if cap else 0
+            selected = [part for duration, part in templates.parts if duration <= limit] if cap else []
+            body = b"[" + b",".join(selected) + b"]"
+            prepared = PreparedBody(body, make_etag("workout-templates", self._version, *key))
+            self._bodies[key] = prepared
+        return prepared
+
+
+# Shared catalog instance
+workout_templates = WorkoutTemplateCatalog(settings.WORKOUT_TEMPLATES_PATH)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Сериализация ответов: путь FastAPI по умолчанию против FastJSONResponse / model_response
+
+Использование:
+    python benchmarks/json_serialization.py [--number 200]
+
+Полезные нагрузки повторяют реальные ответы:
+- данные графика за год (/progress/stats/chart/year, 365 дней);
+- список из 100 тренировок по 8 упражнений (/workouts/).
+
+Путь по умолчанию: jsonable_encoder + json.dumps (JSONResponse), для моделей
+перед этим валидация в WorkoutResponse. Новый путь: FastJSONResponse
+(orjson, если установлен) и model_response (TypeAdapter.dump_json).
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, model_response, orjson
+from app.models.workout import WorkoutResponse
+
+
+def chart_payload(days: int = 365) -> dict:
+    labels = [(date(2025, 1, 1) + timedelta(days=i)).isoformat() for i in range(days)]
+    workouts = [i % 3 for i in range(days)]
+    minutes = [count * 45 for count in workouts]
+    calories = [count * 320 for count in workouts]
+    return {
+        "labels": labels,
+        "datasets": {"workouts": workouts, "minutes": minutes, "calories": calories},
+        "totals": {"workouts": sum(workouts), "minutes": sum(minutes), "calories": sum(calories)},
+    }
+
+
+def workout_rows(count: int = 100, exercises_per_workout: int = 8) -> List[SimpleNamespace]:
+    """Объекты с атрибутами как у ORM-строк Workout (from_attributes)"""
+    created_at = datetime(2025, 1, 1, 18, 30)
+    rows = []
+    for n in range(count):
+        exercises = [
+            SimpleNamespace(
+                id=n * exercises_per_workout + i, exercise_id=i + 1, sets=3, reps=10, weight=42.5,
+                duration_seconds=None, rest_seconds=60, order=i, completed=False, completed_sets=0,
+                exercise=SimpleNamespace(
+                    id=i + 1, name=f"Упражнение {i}", description="Описание техники выполнения",
+                    muscle_group="chest", equipment="dumbbells", difficulty="beginner",
+                    is_active=True, created_at=created_at,
+                ),
+            )
+            for i in range(exercises_per_workout)
+        ]
+        rows.append(SimpleNamespace(
+            id=n, user_id=1, name=f"Тренировка {n}", workout_type="strength", duration_minutes=45,
+            completed=n % 2 == 0, completed_at=created_at if n % 2 == 0 else None,
+            created_at=created_at, exercises=exercises,
+        ))
+    return rows
+
+
+def report(label: str, default, fast, number: int) -> None:
+    default_body, fast_body = default(), fast()
+    default_ms = timeit.timeit(default, number=number) / number * 1000
+    fast_ms = timeit.timeit(fast, number=number) / number * 1000
+    print(f"{label}: {len(default_body)} / {len(fast_body)} байт")
+    print(f"  jsonable_encoder + json  {default_ms:8.3f} мс")
+    print(f"  быстрый путь             {fast_ms:8.3f} мс  (x{default_ms / fast_ms:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение сериализации JSON-ответов")
+    parser.add_argument("--number", type=int, default=200, help="Повторов на каждый замер")
+    args = parser.parse_args()
+
+    print(f"orjson: {'да' if orjson is not None else 'нет (pydantic-core)'}")
+
+    chart = chart_payload()
+    report(
+        "График за год",
+        lambda: JSONResponse(jsonable_encoder(chart)).body,
+        lambda: FastJSONResponse(chart).body,
+        args.number,
+    )
+
+    rows = workout_rows()
+    adapter = TypeAdapter(List[WorkoutResponse])
+    report(
+        "Список тренировок (100 x 8)",
+        # Как FastAPI с response_model: валидация, затем jsonable_encoder и json.dumps
+        lambda: JSONResponse(jsonable_encoder(adapter.validate_python(rows, from_attributes=True))).body,
+        lambda: model_response(adapter, rows).body,
+        args.number,
+    )
+
+
+if __name__ == "__main__":
+    main()
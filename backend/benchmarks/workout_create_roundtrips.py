@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Замер обращений к БД при создании тренировки на 10/50/100 упражнений
+
+Использование:
+    python benchmarks/workout_create_roundtrips.py [--sizes 10 50 100] [--repeat 20]
+
+Сравнивает WorkoutService.create_workout (INSERT ... RETURNING + один пакетный
+INSERT упражнений) с прежней схемой: commit/refresh тренировки, add на каждое
+упражнение и ещё один commit/refresh. Запросы считаются через before_cursor_execute,
+по умолчанию во временной SQLite (или в DATABASE_URL с --use-env-database).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+if "--use-env-database" not in sys.argv:
+    # Настройки читаются при импорте, поэтому база подменяется заранее
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='aigym-bench-')}/bench.db"
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine, init_db
+from app.models.user import User
+from app.models.workout import Workout, WorkoutCreate, WorkoutExercise, WorkoutExerciseCreate
+from app.services.exercise_service import ExerciseService
+from app.services.workout_service import WorkoutService
+
+
+class RoundTrips:
+    """Считает запросы и коммиты движка, пока активен"""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def _statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+
+    def _commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "commit", self._commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._statement)
+        event.remove(engine, "commit", self._commit)
+
+
+def create_per_row(db, user_id: int, workout_data: WorkoutCreate) -> Workout:
+    """Прежняя схема create_workout: для сравнения"""
+    workout = Workout(
+        user_id=user_id,
+        name=workout_data.name,
+        workout_type=workout_data.workout_type,
+        duration_minutes=workout_data.duration_minutes
+    )
+    db.add(workout)
+    db.commit()
+    db.refresh(workout)
+
+    for i, exercise_data in enumerate(workout_data.exercises):
+        db.add(WorkoutExercise(
+            workout_id=workout.id,
+            exercise_id=exercise_data.exercise_id,
+            sets=exercise_data.sets,
+            reps=exercise_data.reps,
+            weight=exercise_data.weight,
+            duration_seconds=exercise_data.duration_seconds,
+            rest_seconds=exercise_data.rest_seconds,
+            order=i
+        ))
+
+    db.commit()
+    db.refresh(workout)
+    return workout
+
+
+def measure(label: str, create, repeat: int) -> None:
+    with RoundTrips() as trips:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            create()
+        elapsed = time.perf_counter() - started
+    print(
+        f"  {label:<14} запросов: {trips.statements / repeat:6.1f}  "
+        f"коммитов: {trips.commits / repeat:5.1f}  "
+        f"время: {elapsed / repeat * 1000:7.2f} мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обращения к БД при создании тренировки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100], help="Число упражнений")
+    parser.add_argument("--repeat", type=int, default=20, help="Тренировок на каждый размер")
+    parser.add_argument("--use-env-database", action="store_true", help="Писать в DATABASE_URL из окружения")
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+
+    db = SessionLocal()
+    try:
+        exercise_service = ExerciseService(db)
+        exercise_service.seed_basic_exercises()
+        exercise_ids = [exercise.id for exercise in exercise_service.get_exercises(limit=100)]
+        user = User(telegram_id=int(time.time() * 1000), first_name="Benchmark")
+        db.add(user)
+        db.commit()
+        service = WorkoutService(db)
+
+        for size in args.sizes:
+            workout_data = WorkoutCreate(
+                name=f"Benchmark {size}",
+                exercises=[
+                    WorkoutExerciseCreate(exercise_id=exercise_ids[i % len(exercise_ids)], order=i)
+                    for i in range(size)
+                ],
+            )
+            print(f"Упражнений: {size}")
+            measure("create_workout", lambda: service.create_workout(user.telegram_id, workout_data), args.repeat)
+            measure("по одному", lambda: create_per_row(db, user.id, workout_data), args.repeat)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
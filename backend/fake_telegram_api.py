@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Локальная заглушка Telegram Bot API для проверки очереди отправки
+
+Эмулирует лимиты Telegram (общий и на чат) и отвечает 429 с retry_after,
+как настоящий Bot API. Укажите в telegram_config.json:
+    "api_url": "http://localhost:8081"
+
+Для long polling обновления подкладываются через POST /updates.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+import uvicorn
+
+from app.core.rate_limit import TokenBucket
+
+app = FastAPI(title="Fake Telegram Bot API")
+
+sent_messages: List[Dict[str, Any]] = []
+limits = {"global_rate": 30.0, "chat_rate": 1.0, "chat_burst": 3}
+global_bucket = TokenBucket(limits["global_rate"], limits["global_rate"])
+chat_buckets: Dict[int, TokenBucket] = {}
+pending_updates: List[Dict[str, Any]] = []
+updates_arrived = asyncio.Event()
+update_ids = itertools.count(1)
+
+
+def error(code: int, description: str, **parameters):
+    body = {"ok": False, "error_code": code, "description": description}
+    if parameters:
+        body["parameters"] = parameters
+    return body
+
+
+@app.post("/bot{token}/sendMessage")
+async def send_message(token: str, request: Request):
+    payload = await request.json()
+    chat_id = payload.get("chat_id")
+    if chat_id is None or not payload.get("text"):
+        return error(400, "Bad Request: chat_id and text are required")
+
+    chat_bucket = chat_buckets.setdefault(chat_id, TokenBucket(limits["chat_burst"], limits["chat_rate"]))
+    wait = max(global_bucket.take(), chat_bucket.take())
+    if wait > 0:
+        return error(429, f"Too Many Requests: retry after {wait:.0f}", retry_after=max(1, round(wait)))
+
+    message = {"message_id": len(sent_messages) + 1, "chat": {"id": chat_id}, "date": int(time.time())}
+    sent_messages.append({**payload, **message})
+    return {"ok": True, "result": {**message, "text": payload["text"]}}
+
+
+@app.post("/bot{token}/getUpdates")
+async def get_updates(token: str, request: Request):
+    payload = await request.json()
+    offset = payload.get("offset") or 0
+    limit = payload.get("limit") or 100
+
+    # Как в Bot API: offset подтверждает все обновления до него
+    pending_updates[:] = [update for update in pending_updates if update["update_id"] >= offset]
+    if not pending_updates:
+        updates_arrived.clear()
+        try:
+            await asyncio.wait_for(updates_arrived.wait(), timeout=payload.get("timeout") or 0)
+        except asyncio.TimeoutError:
+            pass
+    return {"ok": True, "result": pending_updates[:limit]}
+
+
+@app.post("/bot{token}/{method}")
+async def other_method(token: str, method: str):
+    return {"ok": True, "result": True}
+
+
+@app.post("/updates")
+async def add_updates(request: Request):
+    """Подложить обновления для getUpdates (update_id проставляется, если не задан)"""
+    updates = await request.json()
+    for update in updates if isinstance(updates, list) else [updates]:
+        update.setdefault("update_id", next(update_ids))
+        pending_updates.append(update)
+    updates_arrived.set()
+    return {"ok": True, "pending": len(pending_updates)}
+
+
+@app.get("/sent")
+async def get_sent():
+    """Отправленные сообщения (для проверок)"""
+    return sent_messages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--global-rate", type=float, default=limits["global_rate"])
+    parser.add_argument("--chat-rate", type=float, default=limits["chat_rate"])
+    args = parser.parse_args()
+
+    limits.update(global_rate=args.global_rate, chat_rate=args.chat_rate)
+    global_bucket = TokenBucket(args.global_rate, args.global_rate)
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Импорт библиотеки упражнений из CSV / JSON Lines / JSON
+
+Использование:
+    python import_exercises.py exercises.csv [--force]
+
+Колонки: name, description, muscle_group, equipment, difficulty.
+Существующие упражнения обновляются по name, новые добавляются пачками.
+Файл, уже импортированный без изменений, пропускается (если не указан --force).
+"""
+
+import argparse
+import asyncio
+
+from app.core.database import SessionLocal, init_db
+from app.services.exercise_service import ExerciseService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт упражнений")
+    parser.add_argument("path", help="Файл .csv, .jsonl/.ndjson или .json")
+    parser.add_argument("--force", action="store_true", help="Импортировать даже если файл не изменился")
+    args = parser.parse_args()
+
+    asyncio.run(init_db())
+
+    db = SessionLocal()
+    try:
+        totals = ExerciseService(db).import_exercise_file(args.path, force=args.force)
+    finally:
+        db.close()
+
+    if totals is None:
+        print("✅ Файл не изменился с прошлого импорта, пропускаем")
+    else:
+        print(f"✅ Добавлено: {totals['inserted']}, обновлено: {totals['updated']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,39 +2,70 @@
 AIGym Coach Backend - Main Application Entry Point
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import structlog
-from prometheus_client import Counter, Histogram, REGISTRY
 import time
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.db_metrics import QueryStatsMiddleware
+from app.core.metrics import PrometheusMiddleware, mark_process_dead, render_metrics
+from app.core.profiler import RequestProfilingMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.rate_limit import RateLimitMiddleware, create_bucket_store, default_rate_limits
 from app.api.v1.api import api_router
 
-# Prometheus metrics with duplicate check
-def create_counter(name, description, labels):
-    # Check if counter already exists
-    try:
-        return REGISTRY._names_to_collectors[name]
-    except KeyError:
-        return Counter(name, description, labels)
+logger = structlog.get_logger()
+
+
+# Readiness: liveness (/health) answers at once, traffic waits for /ready
+startup_state = {"ready": False, "error": None}
 
-def create_histogram(name, description):
-    # Check if histogram already exists
+
+def prepare_data() -> None:
+    """Seed exercises and warm in-memory catalogs (blocking, runs in a thread)"""
+    from app.services.exercise_service import ExerciseService
+    from app.services.exercise_catalog import exercise_catalog
+    from app.services.workout_templates import workout_templates
+    from app.core.database import SessionLocal
+    
+    db = SessionLocal()
     try:
-        return REGISTRY._names_to_collectors[name]
-    except KeyError:
-        return Histogram(name, description)
+        seeded = ExerciseService(db).seed_basic_exercises()
+        logger.info("Basic exercises seeded", inserted=seeded)
+        exercise_catalog.load(db)
+    finally:
+        db.close()
+    
+    # Workout templates are read from app/data once; a broken file keeps /ready failing
+    workout_templates.load()
 
-REQUEST_COUNT = create_counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
-REQUEST_LATENCY = create_histogram('http_request_duration_seconds', 'HTTP request latency')
 
-logger = structlog.get_logger()
+async def warm_up() -> None:
+    """Startup work done after the server starts listening"""
+    started_at = time.perf_counter()
+    try:
+        await init_db()
+        logger.info("Database initialized")
+        await asyncio.to_thread(prepare_data)
+    except Exception as e:
+        logger.error("Startup failed", exc_info=e)
+        startup_state["error"] = str(e)
+        return
+    
+    startup_state["ready"] = True
+    logger.info("Application ready", seconds=round(time.perf_counter() - started_at, 3))
+    
+    # Not needed for readiness: AI routes fall back to template workouts meanwhile
+    from app.services.ai_service import ai_service
+    await asyncio.to_thread(ai_service.warmup)
 
 
 @asynccontextmanager
@@ -42,25 +73,14 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting AIGym Coach Backend")
-    
-    # Initialize database
-    await init_db()
-    logger.info("Database initialized")
-    
-    # Initialize basic exercises
-    from app.services.exercise_service import ExerciseService
-    from app.core.database import SessionLocal
-    
-    db = SessionLocal()
-    exercise_service = ExerciseService(db)
-    exercise_service.seed_basic_exercises()
-    db.close()
-    logger.info("Basic exercises seeded")
+    warmup_task = asyncio.create_task(warm_up())
     
     yield
     
     # Shutdown
     logger.info("Shutting down AIGym Coach Backend")
+    warmup_task.cancel()
+    mark_process_dead()
 
 
 def create_application() -> FastAPI:
@@ -73,10 +93,25 @@ def create_application() -> FastAPI:
         docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
         redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
         openapi_url="/openapi.json" if settings.ENVIRONMENT != "production" else None,
+        default_response_class=FastJSONResponse,
         lifespan=lifespan
     )
     
     # Add middleware
+    if settings.COMPRESSION_ENABLED:
+        # Innermost, so it sees the final body and the ETag set by the route
+        app.add_middleware(CompressionMiddleware)
+    
+    if settings.REQUEST_PROFILING_ENABLED and settings.ENVIRONMENT != "production":
+        app.add_middleware(RequestProfilingMiddleware)
+    
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            store=create_bucket_store(),
+            limits=default_rate_limits(prefix="/api/v1"),
+        )
+    
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
@@ -87,6 +122,11 @@ def create_application() -> FastAPI:
     
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
     
+    app.add_middleware(QueryStatsMiddleware, server_timing=settings.ENVIRONMENT != "production")
+    
+    # Outermost, so rejected and failed requests are counted too
+    app.add_middleware(PrometheusMiddleware)
+    
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
     
@@ -108,7 +148,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness probe: the process is up (see /ready for serving traffic)"""
     return {
         "status": "healthy",
         "timestamp": time.time(),
@@ -116,6 +156,24 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the database and catalogs are prepared"""
+    if not startup_state["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed" if startup_state["error"] else "starting", "error": startup_state["error"]}
+        )
+    return {"status": "ready"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
@@ -6,8 +7,60 @@ from typing import List, Optional, Dict, Any
 import uvicorn
 import json
 import os
+import sys
+
+from app.services.telegram_bot_client import TELEGRAM_API_URL, TelegramBotClient
+from app.services.telegram_commands import (
+    CommandContext, CommandRouter, Html, MessageTemplate, PreparedMessage, TextTemplate
+)
+from app.services import telegram_bot_service
+from app.services.telegram_outbox import OutboxScheduler, OutboxStore
+from app.services.telegram_polling import LongPollingRunner
+from app.services.telegram_updates import UpdateDispatcher
+
+# Очередь исходящих сообщений бота (создается при старте, если задан токен)
+outbox: Optional[OutboxScheduler] = None
+
+
+def polling_enabled() -> bool:
+    """Long polling вместо webhook: флаг --polling или "polling": true в telegram_config.json"""
+    return os.getenv("TELEGRAM_POLLING") == "1" or bool(telegram_config.get("polling"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Открыть пул соединений с Bot API на время работы сервера"""
+    global outbox
+    client = None
+    poller = None
+    if telegram_config.get("bot_token"):
+        client = TelegramBotClient(
+            telegram_config["bot_token"],
+            api_url=telegram_config.get("api_url", TELEGRAM_API_URL)
+        )
+        outbox = OutboxScheduler(client, OutboxStore(telegram_config.get("outbox_path", "telegram_outbox.db")))
+        await outbox.start()
+        
+        # Режим без публичного URL: обновления забираются через getUpdates
+        if polling_enabled():
+            poller = LongPollingRunner(
+                client, update_dispatcher, telegram_config.get("offset_path", "telegram_offset.txt")
+            )
+            poller.start()
+    
+    yield
+    
+    if poller:
+        await poller.stop()
+    await update_dispatcher.stop()
+    if outbox:
+        await outbox.stop()
+        outbox = None
+    if client:
+        await client.aclose()
 
-app = FastAPI(title="AI Gym Coach Mock API", version="1.0.0")
+
+app = FastAPI(title="AI Gym Coach Mock API", version="1.0.0", lifespan=lifespan)
 
 # CORS для фронтенда
 app.add_middleware(
@@ -132,34 +185,14 @@ class User(BaseModel):
     total_workouts: int
     total_exercises: int
 
-class TelegramUpdate(BaseModel):
-    update_id: int
-    message: Optional[Dict[str, Any]] = None
-    callback_query: Optional[Dict[str, Any]] = None
-
 # Telegram Bot API функции
-def send_telegram_message(chat_id: int, text: str, reply_markup: Optional[Dict] = None):
-    """Отправить сообщение в Telegram"""
-    if not telegram_config.get("bot_token"):
-        print(f"Бот токен не настроен. Сообщение: {text}")
-        return
-    
-    url = f"https://api.telegram.org/bot{telegram_config['bot_token']}/sendMessage"
-    data = {
-        "chat_id": chat_id,
-        "text": text,
-        "parse_mode": "HTML"
-    }
-    
-    if reply_markup:
-        data["reply_markup"] = reply_markup
+async def broadcast_telegram_message(chat_ids: List[int], text: str, reply_markup: Optional[Dict] = None) -> int:
+    """Рассылка (например, напоминания о тренировках) с соблюдением лимитов Telegram"""
+    if not outbox:
+        print(f"Бот токен не настроен. Рассылка: {text}")
+        return 0
     
-    try:
-        import requests
-        response = requests.post(url, json=data, timeout=10)
-        return response.json()
-    except Exception as e:
-        print(f"Ошибка отправки сообщения: {e}")
+    return await outbox.broadcast(chat_ids, text, reply_markup)
 
 def create_inline_keyboard(buttons: List[List[Dict[str, str]]]) -> Dict[str, List]:
     """Создать inline клавиатуру"""
@@ -218,21 +251,10 @@ async def start_workout(workout_id: int):
 async def complete_workout(workout_id: int):
     return {"message": f"Workout {workout_id} completed", "status": "completed"}
 
-# Telegram webhook endpoint
-@app.post("/webhook")
-async def telegram_webhook(request: Request):
-    try:
-        data = await request.json()
-        update = TelegramUpdate(**data)
-        
-        # Обработка сообщений
-        if update.message:
-            message = update.message
-            chat_id = message["chat"]["id"]
-            text = message.get("text", "")
-            
-            if text == "/start":
-                welcome_text = """
+# Сообщения бота: статические сериализуются один раз при старте
+FRONTEND_URL = telegram_config.get("frontend_url", "http://localhost:3000")
+
+WELCOME_MESSAGE = PreparedMessage("""
 🤖 <b>AI Gym Coach</b> - ваш персональный фитнес-помощник!
 
 💪 <b>Возможности:</b>
@@ -242,18 +264,13 @@ async def telegram_webhook(request: Request):
 • Статистика тренировок
 
 📱 <b>Откройте Mini App</b> для полного доступа к функциям!
-                """
-                
-                keyboard = create_inline_keyboard([
-                    [{"text": "🚀 Открыть приложение", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}],
-                    [{"text": "💪 Сгенерировать тренировку", "callback_data": "generate_workout"}],
-                    [{"text": "📊 Моя статистика", "callback_data": "show_stats"}]
-                ])
-                
-                send_telegram_message(chat_id, welcome_text, keyboard)
-                
-            elif text == "/help":
-                help_text = """
+""", create_inline_keyboard([
+    [{"text": "🚀 Открыть приложение", "web_app": {"url": FRONTEND_URL}}],
+    [{"text": "💪 Сгенерировать тренировку", "callback_data": "generate_workout"}],
+    [{"text": "📊 Моя статистика", "callback_data": "show_stats"}]
+]))
+
+HELP_MESSAGE = PreparedMessage("""
 📚 <b>Доступные команды:</b>
 
 /start - Начать работу с ботом
@@ -263,88 +280,153 @@ async def telegram_webhook(request: Request):
 /stats - Показать статистику
 
 💡 <b>Совет:</b> Используйте кнопки для быстрого доступа к функциям!
-                """
-                send_telegram_message(chat_id, help_text)
-                
-            elif text == "/app":
-                keyboard = create_inline_keyboard([
-                    [{"text": "🚀 Открыть AI Gym Coach", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}]
-                ])
-                send_telegram_message(chat_id, "📱 Откройте Mini App для полного доступа к функциям!", keyboard)
-                
-            elif text == "/generate":
-                workout = mock_workouts[0]
-                workout_text = f"""
+""")
+
+APP_MESSAGE = PreparedMessage("📱 Откройте Mini App для полного доступа к функциям!", create_inline_keyboard([
+    [{"text": "🚀 Открыть AI Gym Coach", "web_app": {"url": FRONTEND_URL}}]
+]))
+
+WORKOUT_TEMPLATE = MessageTemplate("""
 💪 <b>Сгенерирована тренировка:</b>
 
-🏃‍♂️ <b>{workout['name']}</b>
-⏱️ Длительность: {workout['duration']} мин
-🎯 Тип: {workout['type']}
-📊 Сложность: {workout['difficulty']}
+🏃‍♂️ <b>{name}</b>
+⏱️ Длительность: {duration} мин
+🎯 {description}
+📊 Сложность: {difficulty}
 
 <b>Упражнения:</b>
-"""
-                for i, exercise_data in enumerate(workout['exercises'], 1):
-                    exercise = exercise_data['exercise']
-                    workout_text += f"{i}. <b>{exercise['name']}</b> - {exercise_data['sets']}x{exercise_data['reps']}\n"
-                
-                keyboard = create_inline_keyboard([
-                    [{"text": "🚀 Открыть в приложении", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}],
-                    [{"text": "💪 Начать тренировку", "callback_data": "start_workout"}]
-                ])
-                
-                send_telegram_message(chat_id, workout_text, keyboard)
-                
-            elif text == "/stats":
-                user = mock_users[0]
-                stats_text = f"""
+{exercises}""", create_inline_keyboard([
+    [{"text": "🚀 Открыть в приложении", "web_app": {"url": FRONTEND_URL}}],
+    [{"text": "💪 Начать тренировку", "callback_data": "start_workout"}]
+]))
+
+WORKOUT_EXERCISE_LINE = TextTemplate("{index}. <b>{name}</b> - {sets}x{reps}\n")
+
+WORKOUT_SHORT_TEMPLATE = MessageTemplate(
+    "💪 <b>Сгенерирована тренировка:</b>\n\n🏃‍♂️ {name}\n⏱️ {duration} мин",
+    create_inline_keyboard([[{"text": "🚀 Открыть в приложении", "web_app": {"url": FRONTEND_URL}}]])
+)
+
+STATS_TEMPLATE = MessageTemplate("""
 📊 <b>Ваша статистика:</b>
 
-👤 <b>{user['first_name']} {user['last_name']}</b>
-🏆 Уровень: {user['level']}
-💪 Всего тренировок: {user['total_workouts']}
-🎯 Всего упражнений: {user['total_exercises']}
+👤 <b>{first_name} {last_name}</b>
+🏆 Уровень: {level}
+💪 Всего тренировок: {total_workouts}
+🎯 Всего упражнений: {total_exercises}
+
+🔥 Серия: {streak_days} дн.
 
 📈 <b>Прогресс:</b>
-• Неделя: +3 тренировки
-• Месяц: +12 тренировок
-• Год: +45 тренировок
-                """
-                
-                keyboard = create_inline_keyboard([
-                    [{"text": "📱 Подробная статистика", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}],
-                    [{"text": "🎯 Новые цели", "callback_data": "set_goals"}]
-                ])
-                
-                send_telegram_message(chat_id, stats_text, keyboard)
-        
-        # Обработка callback query
-        elif update.callback_query:
-            callback_query = update.callback_query
-            chat_id = callback_query["message"]["chat"]["id"]
-            data = callback_query.get("data", "")
-            
-            if data == "generate_workout":
-                workout = mock_workouts[0]
-                workout_text = f"💪 <b>Сгенерирована тренировка:</b>\n\n🏃‍♂️ {workout['name']}\n⏱️ {workout['duration']} мин"
-                keyboard = create_inline_keyboard([
-                    [{"text": "🚀 Открыть в приложении", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}]
-                ])
-                send_telegram_message(chat_id, workout_text, keyboard)
-                
-            elif data == "show_stats":
-                user = mock_users[0]
-                stats_text = f"📊 <b>Статистика:</b>\n\n💪 Тренировок: {user['total_workouts']}\n🎯 Упражнений: {user['total_exercises']}"
-                keyboard = create_inline_keyboard([
-                    [{"text": "📱 Подробнее", "web_app": {"url": telegram_config.get("frontend_url", "http://localhost:3000")}}]
-                ])
-                send_telegram_message(chat_id, stats_text, keyboard)
-        
-        return {"status": "ok"}
-        
+• Неделя: +{week_workouts}
+• Месяц: +{month_workouts}
+• Год: +{year_workouts}
+""", create_inline_keyboard([
+    [{"text": "📱 Подробная статистика", "web_app": {"url": FRONTEND_URL}}],
+    [{"text": "🎯 Новые цели", "callback_data": "set_goals"}]
+]))
+
+STATS_SHORT_TEMPLATE = MessageTemplate(
+    "📊 <b>Статистика:</b>\n\n💪 Тренировок: {total_workouts}\n🎯 Упражнений: {total_exercises}",
+    create_inline_keyboard([[{"text": "📱 Подробнее", "web_app": {"url": FRONTEND_URL}}]])
+)
+
+NO_PROFILE_MESSAGE = PreparedMessage(
+    "👋 Профиль пока не создан. Откройте Mini App - после первой тренировки здесь появится статистика.",
+    create_inline_keyboard([[{"text": "🚀 Открыть AI Gym Coach", "web_app": {"url": FRONTEND_URL}}]])
+)
+
+bot_commands = CommandRouter(telegram_config.get("bot_username"))
+
+
+def send_prepared(chat_id: int, body: bytes):
+    """Поставить в очередь готовое тело sendMessage"""
+    if not outbox:
+        print(f"Бот токен не настроен. Сообщение: {body.decode()}")
+        return
+    
+    outbox.send_prepared(chat_id, body)
+
+
+@bot_commands.command("start")
+async def start_command(ctx: CommandContext):
+    send_prepared(ctx.chat_id, WELCOME_MESSAGE.payload(ctx.chat_id))
+
+
+@bot_commands.command("help")
+async def help_command(ctx: CommandContext):
+    send_prepared(ctx.chat_id, HELP_MESSAGE.payload(ctx.chat_id))
+
+
+@bot_commands.command("app")
+async def app_command(ctx: CommandContext):
+    send_prepared(ctx.chat_id, APP_MESSAGE.payload(ctx.chat_id))
+
+
+async def send_workout(ctx: CommandContext, template: MessageTemplate):
+    """Сгенерировать тренировку по профилю пользователя и отправить"""
+    workout = await telegram_bot_service.generate_workout(ctx.user.get("id", ctx.chat_id))
+    exercises = "".join(
+        WORKOUT_EXERCISE_LINE.render(index=i, name=exercise.name, sets=exercise.sets, reps=exercise.reps)
+        for i, exercise in enumerate(workout.exercises, 1)
+    )
+    send_prepared(ctx.chat_id, template.payload(
+        ctx.chat_id,
+        name=workout.title,
+        duration=workout.duration_minutes,
+        description=workout.description,
+        difficulty=workout.difficulty,
+        exercises=Html(exercises)
+    ))
+
+
+async def send_stats(ctx: CommandContext, key: str, template: MessageTemplate):
+    """Карточка статистики из кэша; агрегаты пересчитываются только после изменений пользователя"""
+    card = await telegram_bot_service.get_stat_card(
+        ctx.user.get("id", ctx.chat_id), key, lambda values: template.prepare(**values)
+    )
+    send_prepared(ctx.chat_id, (card or NO_PROFILE_MESSAGE).payload(ctx.chat_id))
+
+
+@bot_commands.command("generate")
+async def generate_command(ctx: CommandContext):
+    await send_workout(ctx, WORKOUT_TEMPLATE)
+
+
+@bot_commands.command("stats")
+async def stats_command(ctx: CommandContext):
+    await send_stats(ctx, "stats", STATS_TEMPLATE)
+
+
+@bot_commands.callback("generate_workout")
+async def generate_workout_callback(ctx: CommandContext):
+    await send_workout(ctx, WORKOUT_SHORT_TEMPLATE)
+
+
+@bot_commands.callback("show_stats")
+async def show_stats_callback(ctx: CommandContext):
+    await send_stats(ctx, "stats_short", STATS_SHORT_TEMPLATE)
+
+
+# Обработка обновлений Telegram
+async def handle_telegram_update(data: Dict[str, Any]):
+    """Обработать одно обновление (вызывается диспетчером, по порядку в рамках чата)"""
+    await bot_commands.dispatch(data)
+
+update_dispatcher = UpdateDispatcher(handle_telegram_update)
+
+# Telegram webhook endpoint
+@app.post("/webhook")
+async def telegram_webhook(request: Request):
+    try:
+        data = await request.json()
     except Exception as e:
         print(f"Ошибка обработки webhook: {e}")
         return {"status": "error", "message": str(e)}
+    
+    # Отвечаем сразу: обработка идет в фоне, повторные update_id отбрасываются
+    update_dispatcher.submit(data)
+    return {"status": "ok"}
 
 # Статический файл для фронтенда (если нужно)
 @app.get("/app", response_class=HTMLResponse)
@@ -372,11 +454,18 @@ async def serve_frontend():
     """)
 
 if __name__ == "__main__":
+    if "--polling" in sys.argv:
+        # Через окружение, чтобы флаг дошел до процесса uvicorn с reload
+        os.environ["TELEGRAM_POLLING"] = "1"
+    
     print("🚀 Запуск Mock API сервера с поддержкой Telegram...")
     print("📍 URL: http://localhost:8000")
     print("📚 API Docs: http://localhost:8000/docs")
     print("🔧 Health Check: http://localhost:8000/health")
-    print("🤖 Telegram Webhook: http://localhost:8000/webhook")
+    if polling_enabled():
+        print("🤖 Telegram: long polling (публичный URL не нужен)")
+    else:
+        print("🤖 Telegram Webhook: http://localhost:8000/webhook")
     
     if telegram_config:
         print(f"✅ Telegram конфигурация загружена")
@@ -0,0 +1,64 @@
+"""
+Shared fixtures: an isolated SQLite database and a statement counter
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Settings are read at import time, so point them at a throwaway database first
+_db_dir = tempfile.mkdtemp(prefix="aigym-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ["DEBUG"] = "false"
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine, init_db
+import app.models.workout_history  # noqa: F401 - registers the progress tables
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    asyncio.run(init_db())
+    yield engine
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class StatementCounter:
+    """Counts statements sent to the primary engine while active"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def count_queries():
+    """Usage: with count_queries() as counter: ...; counter.count"""
+    @contextmanager
+    def counting():
+        counter = StatementCounter()
+        event.listen(engine, "before_cursor_execute", counter._record)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", counter._record)
+    return counting
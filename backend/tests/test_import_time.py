@@ -0,0 +1,55 @@
+"""
+Cold import of the application stays cheap: heavy SDKs load lazily after startup
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Cumulative time of `import main`; about 1.1s on a developer machine
+IMPORT_TIME_BUDGET_US = 3_000_000
+
+LAZY_MODULES = ("google.generativeai",)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    # DATABASE_URL and DEBUG come from conftest through the inherited environment
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+
+
+def _cumulative_import_time(stderr: str, module: str) -> int:
+    """Cumulative microseconds of `module` from -X importtime output"""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level entries are not indented
+        if name == f" {module}":
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_import_main_within_budget():
+    result = _run_python("-X", "importtime", "-c", "import main")
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    elapsed = _cumulative_import_time(result.stderr, "main")
+    assert elapsed < IMPORT_TIME_BUDGET_US, f"import main took {elapsed / 1e6:.2f}s"
+
+
+def test_import_main_skips_lazy_modules():
+    check = (
+        "import sys, main; "
+        f"loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]; "
+        "print(','.join(loaded))"
+    )
+    result = _run_python("-c", check)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip() == "", f"imported at startup: {result.stdout.strip()}"
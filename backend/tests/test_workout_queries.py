@@ -0,0 +1,76 @@
+"""
+Query counts of the workout read endpoints must not grow with the data
+"""
+
+import itertools
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import workouts
+from app.models.user import User
+from app.models.workout import WorkoutCreate, WorkoutExerciseCreate
+from app.services.exercise_service import ExerciseService
+from app.services.workout_service import WorkoutService
+
+_telegram_ids = itertools.count(1000)
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.include_router(workouts.router, prefix="/workouts")
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user_with_workouts(db):
+    ExerciseService(db).seed_basic_exercises()
+
+    def make(workout_count: int, exercises_per_workout: int) -> int:
+        user = User(telegram_id=next(_telegram_ids), first_name="Test")
+        db.add(user)
+        db.commit()
+
+        exercise_ids = [exercise.id for exercise in ExerciseService(db).get_exercises(limit=100)]
+        service = WorkoutService(db)
+        for n in range(workout_count):
+            service.create_workout(user.telegram_id, WorkoutCreate(
+                name=f"Workout {n}",
+                exercises=[
+                    WorkoutExerciseCreate(exercise_id=exercise_ids[i % len(exercise_ids)], order=i)
+                    for i in range(exercises_per_workout)
+                ],
+            ))
+        return user.telegram_id
+
+    return make
+
+
+def test_workout_list_query_count_is_constant(client, make_user_with_workouts, count_queries):
+    counts = []
+    for workout_count, exercises_per_workout in [(1, 1), (5, 4), (10, 12)]:
+        telegram_id = make_user_with_workouts(workout_count, exercises_per_workout)
+        with count_queries() as counter:
+            response = client.get("/workouts/", params={"telegram_id": telegram_id, "limit": 100})
+        assert response.status_code == 200
+        assert len(response.json()) == workout_count
+        assert sum(len(w["exercises"]) for w in response.json()) == workout_count * exercises_per_workout
+        counts.append(counter.count)
+
+    # users.id lookup, workouts page, one SELECT ... IN for exercises with their exercise rows
+    assert counts == [counts[0]] * len(counts), counts
+    assert counts[0] <= 3, counts
+
+
+def test_workout_detail_is_one_query(client, make_user_with_workouts, db, count_queries):
+    telegram_id = make_user_with_workouts(1, 8)
+    workout_id = client.get("/workouts/", params={"telegram_id": telegram_id}).json()[0]["id"]
+
+    with count_queries() as counter:
+        response = client.get(f"/workouts/{workout_id}")
+
+    assert response.status_code == 200
+    assert len(response.json()["exercises"]) == 8
+    assert counter.count == 1, counter.statements
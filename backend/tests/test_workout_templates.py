@@ -0,0 +1,59 @@
+"""
+Workout templates keep the data file order; filters only drop entries
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import ai
+from app.services.workout_templates import workout_templates
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.include_router(ai.router, prefix="/ai")
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    with open(workout_templates.path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def expected(rows, level, equipment=None, max_duration=None):
+    return [
+        {key: value for key, value in row.items() if key != "level"}
+        for row in rows
+        if row["level"] == level
+        and (equipment is None or row["equipment"] == equipment)
+        and (max_duration is None or row["duration"] <= max_duration)
+    ]
+
+
+def test_unfiltered_templates_follow_file_order(client, rows):
+    response = client.get("/ai/workout-templates/beginner")
+    assert response.status_code == 200
+    assert [template["id"] for template in response.json()] == [
+        row["id"] for row in rows if row["level"] == "beginner"
+    ]
+    assert response.json() == expected(rows, "beginner")
+
+
+@pytest.mark.parametrize("max_duration", [None, 1, 20, 25, 30, 45, 60, 1000])
+def test_filters_keep_file_order(client, rows, max_duration):
+    for level in {row["level"] for row in rows}:
+        for equipment in [None, "unknown"] + sorted({row["equipment"] for row in rows}):
+            params = {key: value for key, value in
+                      {"equipment": equipment, "max_duration": max_duration}.items() if value is not None}
+            response = client.get(f"/ai/workout-templates/{level}", params=params)
+            assert response.status_code == 200
+            assert response.json() == expected(rows, level, equipment, max_duration), (level, params)
+
+
+def test_unknown_level(client):
+    assert client.get("/ai/workout-templates/expert").status_code == 400
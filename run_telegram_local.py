@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Скрипт для запуска приложения в Telegram с localtunnel
+
+С флагом --polling бот получает обновления через long polling,
+туннель и webhook не нужны.
 """
 
 import subprocess
@@ -12,7 +15,8 @@ import sys
 from typing import Optional
 
 class TelegramLocalRunner:
-    def __init__(self):
+    def __init__(self, polling: bool = False):
+        self.polling = polling
         self.backend_process = None
         self.frontend_process = None
         self.tunnel_process = None
@@ -38,8 +42,11 @@ class TelegramLocalRunner:
         print("🚀 Запуск backend сервера...")
         
         try:
+            command = [sys.executable, "backend/mock_server.py"]
+            if self.polling:
+                command.append("--polling")
             self.backend_process = subprocess.Popen(
-                [sys.executable, "backend/mock_server.py"],
+                command,
                 cwd=os.getcwd(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -241,8 +248,10 @@ class TelegramLocalRunner:
             if not self.start_frontend():
                 return False
             
-            # Запускаем tunnel
-            if not self.start_tunnel():
+            # Запускаем tunnel (при long polling он не нужен)
+            if self.polling:
+                print("🤖 Бот работает через long polling, туннель не запускается")
+            elif not self.start_tunnel():
                 print("⚠️ Продолжаем без туннеля (только локальное тестирование)")
             
             # Настраиваем Telegram бота
@@ -254,7 +263,9 @@ class TelegramLocalRunner:
             
             print("\n🎉 ЗАПУСК ЗАВЕРШЕН!")
             print("=" * 50)
-            if self.tunnel_url:
+            if self.polling:
+                print("Бот отвечает в Telegram; Mini App доступно локально")
+            elif self.tunnel_url:
                 print("Теперь настройте Telegram бота и протестируйте приложение!")
             else:
                 print("Для тестирования в реальном Telegram настройте туннель")
@@ -273,7 +284,7 @@ class TelegramLocalRunner:
             return False
 
 def main():
-    runner = TelegramLocalRunner()
+    runner = TelegramLocalRunner(polling="--polling" in sys.argv)
     runner.run()
 
 if __name__ == "__main__":